@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""Stand-in for the yt-dlp executable, for benchmarks. Never touches the network.
+
+Behaviour is set through the query string of each URL, e.g.
+
+    fake://bench/v1?lines=2000&rate=500&merge=1&stall=5&exit=0
+
+lines   progress updates printed per item (default 100)
+rate    progress updates per second, 0 = as fast as possible (default 0)
+size    item size in bytes (default 10485760)
+items   playlist size; flat extraction (--flat-playlist) lists the items as separate URLs (default 0)
+merge   1 prints a [Merger] step (default 0)
+stall   seconds of silence halfway through each item (default 0)
+exit    exit code (default 0)
+term    "ignore" makes the process ignore SIGTERM, so a cancel has to escalate to SIGKILL
+
+Progress is printed through --progress-template / --print after_move when given, like yt-dlp
+does, otherwise as classic "[download]  42.0% of ..." lines. No files are written.
+"""
+import re
+import sys
+import json
+import time
+import signal
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+FIELD_RE = re.compile(r'%\(([\w.]+)\)s')
+
+
+def fill(template, values):
+    """Expands %(name)s fields like yt-dlp, printing NA for unknown ones."""
+    return FIELD_RE.sub(lambda m: str(values.get(m.group(1), "NA")), template)
+
+
+def parse_args(argv):
+    options = {"templates": {}, "after_move": None, "output": "%(title)s [%(id)s].%(ext)s",
+               "flat": False, "extract_audio": False, "urls": []}
+    takes_value = {"-o", "--output", "-f", "--format", "--audio-format", "--download-archive", "-r", "--limit-rate",
+                   "-N", "--concurrent-fragments", "--load-info-json", "--progress-template", "--print"}
+    args = iter(argv)
+    for arg in args:
+        if arg in takes_value:
+            value = next(args, "")
+            if arg == "--progress-template":
+                kind, _, template = value.partition(":")
+                options["templates"][kind] = template
+            elif arg == "--print" and value.startswith("after_move:"):
+                options["after_move"] = value[len("after_move:"):]
+            elif arg in ("-o", "--output") and not re.match(r'^\w+:', value):
+                options["output"] = value
+        elif arg == "--flat-playlist":
+            options["flat"] = True
+        elif arg in ("-x", "--extract-audio"):
+            options["extract_audio"] = True
+        elif not arg.startswith("-"):
+            options["urls"].append(arg)
+    return options
+
+
+def emit(line):
+    sys.stdout.write(line + "\n")
+    sys.stdout.flush()
+
+
+def run_item(options, video_id, params, index=None, count=None):
+    lines = int(params.get("lines", 100))
+    rate = float(params.get("rate", 0))
+    size = int(params.get("size", 10 * 1024 * 1024))
+    stall = float(params.get("stall", 0))
+    ext = "mp3" if options["extract_audio"] else "mp4"
+    filepath = fill(options["output"], {"title": f"Bench {video_id}", "id": video_id, "ext": ext,
+                                        "playlist_index": index or "NA"})
+    info = {"info.id": video_id, "info.playlist_index": index or "NA", "info.n_entries": count or "NA"}
+
+    emit(f"[generic] {video_id}: Downloading webpage")
+    emit(f"[info] {video_id}: Downloading 1 format(s): 0")
+    emit(f"[download] Destination: {filepath}")
+    download_template = options["templates"].get("download")
+    started = time.monotonic()
+    for i in range(1, lines + 1):
+        if stall and i == lines // 2:
+            time.sleep(stall)
+        downloaded = size * i // lines
+        speed = 2 * 1024 * 1024
+        eta = (size - downloaded) // speed
+        status = "finished" if i == lines else "downloading"
+        if download_template:
+            emit(fill(download_template, dict(info, **{
+                "progress.status": status, "progress.downloaded_bytes": downloaded, "progress.total_bytes": size,
+                "progress.speed": float(speed), "progress.eta": eta})))
+        else:
+            emit(f"[download] {downloaded * 100 / size:5.1f}% of {size / 1048576:7.2f}MiB at {speed / 1048576:6.2f}MiB/s ETA 00:{eta:02d}")
+        if rate:
+            delay = started + i / rate - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+    postprocess_template = options["templates"].get("postprocess")
+    steps = (["Merger"] if params.get("merge") == "1" else []) + (["ExtractAudio"] if options["extract_audio"] else [])
+    for step in steps:
+        if postprocess_template:
+            emit(fill(postprocess_template, dict(info, **{"progress.status": "started", "progress.postprocessor": step})))
+        emit(f'[Merger] Merging formats into "{filepath}"' if step == "Merger" else f"[ExtractAudio] Destination: {filepath}")
+        if postprocess_template:
+            emit(fill(postprocess_template, dict(info, **{"progress.status": "finished", "progress.postprocessor": step})))
+    if options["after_move"]:
+        emit(fill(options["after_move"], {"extractor_key": "Generic", "id": video_id, "playlist_index": index or "NA",
+                                          "n_entries": count or "NA", "filepath": filepath}))
+
+
+def main(argv):
+    options = parse_args(argv)
+    if not options["urls"]:
+        print("ERROR: no URL given", file=sys.stderr)
+        return 2
+    url = options["urls"][0]
+    parts = urlsplit(url)
+    params = dict(parse_qsl(parts.query))
+    video_id = parts.path.strip("/").replace("/", "-") or "video"
+    if params.get("term") == "ignore" and hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    items = int(params.get("items", 0))
+
+    if options["flat"]:
+        if not items:
+            print(json.dumps({"_type": "video", "id": video_id, "title": f"Bench {video_id}"}))
+            return 0
+        item_params = urlencode({k: v for k, v in params.items() if k != "items"})
+        entries = [{"_type": "url", "ie_key": "Generic", "id": f"{video_id}-{n}",
+                    "url": f"{parts.scheme}://{parts.netloc}/{video_id}-{n}?{item_params}"} for n in range(1, items + 1)]
+        print(json.dumps({"_type": "playlist", "id": video_id, "title": f"Bench {video_id}", "entries": entries}))
+        return 0
+
+    emit(f"[generic] Extracting URL: {url}")
+    if items:
+        emit(f"[download] Downloading playlist: Bench {video_id}")
+        for n in range(1, items + 1):
+            emit(f"[download] Downloading item {n} of {items}")
+            run_item(options, f"{video_id}-{n}", params, n, items)
+    else:
+        run_item(options, video_id, params)
+    return int(params.get("exit", 0))
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""VidSnare overhead benchmarks. Headless and offline: yt-dlp is replaced by bench/fake_yt_dlp.py.
+
+    python bench/run_bench.py            # all benchmarks
+    python bench/run_bench.py --quick    # smaller sizes, for a fast smoke run
+    python bench/run_bench.py --only parser cancel --json results.json
+
+Benchmarks:
+  parser     progress-record parsing, lines/sec (no processes)
+  pipeline   one job's output through the engine's reader loop, lines/sec
+  ui_drain   delay between a line/update being queued and the 100 ms UI tick draining it
+  pane       memory of the output pane buffer while far more lines arrive than it keeps
+  cancel     time from cancel to job done, for a silent job and one that ignores SIGTERM
+  scaling    wall time of a batch of paced jobs at 1, 2, 4 and 8 worker slots
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR)) # Run from a checkout without installing
+
+from vidsnare.engine import DownloadEngine, EngineListener
+from vidsnare.logbuffer import LogBuffer
+from vidsnare.uibatch import UiBatcher
+from vidsnare.progress import DOWNLOAD_TEMPLATE, parse_progress_line
+from fake_yt_dlp import fill
+
+FAKE_YT_DLP = os.path.join(BENCH_DIR, "fake_yt_dlp.py")
+OUTPUT_DIR = tempfile.gettempdir() # The fake writes no files
+UI_TICK = 0.1 # Same interval as App.process_ui_queue
+
+
+def fake_url(name, **params):
+    query = "&".join(f"{key}={value}" for key, value in params.items())
+    return f"fake://bench/{name}?{query}"
+
+
+def make_engine(workers=1, listener=None):
+    """Returns an engine that runs the fake yt-dlp with every optional store disabled."""
+    return DownloadEngine(max_workers=workers, listener=listener or EngineListener(), ffmpeg_available=True,
+                          yt_dlp_command=FAKE_YT_DLP, backend="subprocess", index_file=None, journal_file=None,
+                          playlist_fanout=True, pipeline_postprocess=False, concurrent_fragments=1)
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+# --- Counting Listener ---
+class CountingListener(EngineListener):
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.output_lines = 0
+        self.progress_events = 0
+
+    def on_output(self, job, line):
+        with self.lock: self.output_lines += 1
+
+    def on_progress(self, job, event):
+        with self.lock: self.progress_events += 1
+
+
+# --- Headless UI ---
+class HeadlessUiListener(EngineListener):
+    """GuiListener on the app's own UiBatcher, with a timer thread as the Tk loop and plain strings as widgets."""
+    def __init__(self, max_lines):
+        self.log = LogBuffer(max_lines)
+        self.line_latency = []
+        self.queue_latency = []
+        self.tick_cost = []
+        self.batcher = UiBatcher(self.log, self.queue_latency.append, self.line_latency.append)
+        self.pane = [] # Lines of the output textbox
+        self.rows = {} # job_id -> row text, stands in for the jobs panel
+
+    def on_output(self, job, line):
+        self.log.append(f"[Job {job.job_id}] {line}")
+
+    def on_job_update(self, job):
+        self.batcher.mark_job_dirty(job)
+
+    def on_job_finished(self, job):
+        self.batcher.queue_call(self.draw_job, job)
+
+    # --- View (what App draws into Tk widgets) ---
+    def draw_lines(self, lines, replace, trim):
+        if replace: self.pane.clear()
+        self.pane.extend(lines)
+        if trim: del self.pane[:trim]
+
+    def draw_job(self, job):
+        self.rows[job.job_id] = f"#{job.job_id} {job.url} - {job.status_text} {job.progress:.3f}"
+
+    def draw_overall(self):
+        pass
+
+    def tick(self):
+        """One UI tick, exactly as App.process_ui_queue runs it."""
+        started = time.monotonic()
+        self.batcher.tick(self)
+        self.tick_cost.append(time.monotonic() - started)
+
+    def run(self, stop):
+        while not stop.is_set():
+            time.sleep(UI_TICK)
+            self.tick()
+        self.tick()
+
+
+# --- Benchmarks ---
+def bench_parser(quick):
+    count = 50_000 if quick else 500_000
+    lines = []
+    for i in range(count):
+        if i % 5 == 4:
+            lines.append(f"[generic] dQw4w9WgXcQ: Downloading webpage {i}") # Regular log line
+        else:
+            lines.append(fill(DOWNLOAD_TEMPLATE, {
+                "progress.status": "downloading", "progress.downloaded_bytes": i * 20, "progress.total_bytes": 10485760,
+                "progress.speed": 2097152.0, "progress.eta": 4, "info.playlist_index": 3, "info.n_entries": 12,
+                "info.id": "dQw4w9WgXcQ"}))
+    started = time.perf_counter()
+    parsed = sum(1 for line in lines if parse_progress_line(line) is not None)
+    elapsed = time.perf_counter() - started
+    return {"lines": count, "records": parsed, "seconds": round(elapsed, 3), "lines_per_sec": round(count / elapsed)}
+
+
+def bench_pipeline(quick):
+    lines = 20_000 if quick else 200_000
+    listener = CountingListener()
+    engine = make_engine(1, listener)
+    started = time.perf_counter()
+    cpu_started = time.process_time()
+    job = engine.submit(fake_url("pipeline", lines=lines), OUTPUT_DIR)
+    engine.wait()
+    elapsed = time.perf_counter() - started
+    cpu = time.process_time() - cpu_started
+    engine.close()
+    total = listener.output_lines + listener.progress_events
+    return {"status": job.status, "lines": total, "progress_events": listener.progress_events, "seconds": round(elapsed, 3),
+            "lines_per_sec": round(total / elapsed), "engine_cpu_us_per_line": round(cpu * 1e6 / total, 2)}
+
+
+def bench_ui_drain(quick):
+    jobs = 4
+    lines = 2_000 if quick else 10_000
+    listener = HeadlessUiListener(max_lines=2000)
+    stop = threading.Event()
+    ticker = threading.Thread(target=listener.run, args=(stop,), daemon=True)
+    ticker.start()
+    engine = make_engine(jobs, listener)
+    for i in range(jobs):
+        engine.submit(fake_url(f"ui{i}", lines=lines, rate=lines // 2), OUTPUT_DIR) # Each job runs about 2 s
+    engine.wait()
+    engine.close()
+    stop.set()
+    ticker.join()
+    return {"ticks": len(listener.tick_cost),
+            "line_latency_p50_ms": round(percentile(listener.line_latency, 0.5) * 1000, 1),
+            "line_latency_p95_ms": round(percentile(listener.line_latency, 0.95) * 1000, 1),
+            "line_latency_max_ms": round(max(listener.line_latency, default=0) * 1000, 1),
+            "queue_latency_max_ms": round(max(listener.queue_latency, default=0) * 1000, 1),
+            "tick_cost_p95_ms": round(percentile(listener.tick_cost, 0.95) * 1000, 2),
+            "tick_cost_max_ms": round(max(listener.tick_cost, default=0) * 1000, 2)}
+
+
+def bench_pane(quick):
+    total = 100_000 if quick else 1_000_000
+    line = "[Job 12] [download]  42.0% of   10.00MiB at    2.00MiB/s ETA 00:03 (item 3 of 12)"
+    buffer = LogBuffer(max_lines=2000)
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    samples = []
+    checkpoint = total // 5
+    for i in range(1, total + 1):
+        buffer.append(line)
+        if i % 500 == 0: # The UI drains the pending lines every tick
+            buffer.take_pending()
+        if i % checkpoint == 0:
+            samples.append(round((tracemalloc.get_traced_memory()[0] - baseline) / 1024, 1))
+    undrained = LogBuffer(max_lines=2000) # A stalled UI never calls take_pending()
+    for _ in range(total // 10):
+        undrained.append(line)
+    stalled_kib = round((tracemalloc.get_traced_memory()[0] - baseline) / 1024, 1) - samples[-1]
+    tracemalloc.stop()
+    return {"lines": total, "kib_at_checkpoints": samples, "growth_kib": round(samples[-1] - samples[0], 1),
+            "stalled_ui_kib": round(stalled_kib, 1), "stalled_ui_dropped": undrained.take_pending()[1]}
+
+
+def bench_cancel(quick):
+    results = {}
+    engine = make_engine(2)
+    for name, params in (("silent", {"lines": 10, "stall": 60}), ("ignores_sigterm", {"lines": 10, "stall": 60, "term": "ignore"})):
+        job = engine.submit(fake_url(f"cancel-{name}", **params), OUTPUT_DIR)
+        time.sleep(1.0) # Let it reach the stall
+        started = time.perf_counter()
+        engine.cancel(job.job_id)
+        while not job.is_done():
+            time.sleep(0.005)
+        results[f"{name}_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        results[f"{name}_status"] = job.status
+    engine.wait()
+    engine.close()
+    return results
+
+
+def bench_scaling(quick):
+    jobs = 8
+    lines = 100 if quick else 300
+    rate = 100 # Each job takes lines / rate seconds
+    results = {"jobs": jobs, "seconds_per_job": lines / rate}
+    for workers in (1, 2, 4, 8):
+        engine = make_engine(workers)
+        started = time.perf_counter()
+        for i in range(jobs):
+            engine.submit(fake_url(f"scale{workers}-{i}", lines=lines, rate=rate), OUTPUT_DIR)
+        engine.wait()
+        elapsed = time.perf_counter() - started
+        engine.close()
+        results[f"workers_{workers}_s"] = round(elapsed, 2)
+        results[f"workers_{workers}_efficiency"] = round(jobs * lines / rate / workers / elapsed, 2)
+    return results
+
+
+BENCHMARKS = {"parser": bench_parser, "pipeline": bench_pipeline, "ui_drain": bench_ui_drain,
+              "pane": bench_pane, "cancel": bench_cancel, "scaling": bench_scaling}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="VidSnare overhead benchmarks (offline, uses a fake yt-dlp).")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="Run only these benchmarks")
+    parser.add_argument("--quick", action="store_true", help="Smaller sizes for a fast smoke run")
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this file")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name in args.only or BENCHMARKS:
+        print(f"[Bench] {name}...", flush=True)
+        results[name] = BENCHMARKS[name](args.quick)
+        for key, value in results[name].items():
+            print(f"    {key}: {value}")
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
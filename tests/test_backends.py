@@ -0,0 +1,84 @@
+"""Both download backends against a local HTTP server serving a media file (no network needed)."""
+import os
+import shutil
+import threading
+import functools
+import http.server
+
+import pytest
+
+from vidsnare.engine import DownloadEngine, EngineListener
+from vidsnare.inprocess import inprocess_available
+
+MEDIA_BYTES = os.urandom(256 * 1024)
+
+
+class RecordingListener(EngineListener):
+    def __init__(self):
+        self.lines = []
+        self.events = []
+
+    def on_output(self, job, line):
+        self.lines.append(line)
+
+    def on_progress(self, job, event):
+        self.events.append(event)
+
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def media_server(tmp_path):
+    """Serves clip.mp4 from a temporary folder on 127.0.0.1. Yields the base URL."""
+    served = tmp_path / "served"
+    served.mkdir()
+    (served / "clip.mp4").write_bytes(MEDIA_BYTES)
+    handler = functools.partial(QuietHandler, directory=str(served))
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def run_one(backend, url, output_dir):
+    listener = RecordingListener()
+    engine = DownloadEngine(max_workers=1, listener=listener, backend=backend, pipeline_postprocess=False,
+                            concurrent_fragments=1)
+    try:
+        job = engine.submit(url, str(output_dir))
+        assert engine.wait(timeout=60)
+    finally:
+        engine.close()
+    return job, listener
+
+
+@pytest.mark.skipif(not shutil.which("yt-dlp"), reason="yt-dlp executable not installed")
+def test_subprocess_backend_downloads_local_file(media_server, tmp_path):
+    output_dir = tmp_path / "out"
+    output_dir.mkdir()
+    job, listener = run_one("subprocess", f"{media_server}/clip.mp4", output_dir)
+    assert job.status == "finished", listener.lines
+    saved = [path for path in output_dir.iterdir() if path.suffix == ".mp4"]
+    assert len(saved) == 1 and saved[0].read_bytes() == MEDIA_BYTES
+    assert any(event.stage == "done" and event.filepath for event in listener.events)
+
+
+@pytest.mark.skipif(not inprocess_available(), reason="yt_dlp package not installed")
+def test_inprocess_backend_downloads_local_file(media_server, tmp_path):
+    output_dir = tmp_path / "out"
+    output_dir.mkdir()
+    job, listener = run_one("inprocess", f"{media_server}/clip.mp4", output_dir)
+    assert job.status == "finished", listener.lines
+    saved = [path for path in output_dir.iterdir() if path.suffix == ".mp4"]
+    assert len(saved) == 1 and saved[0].read_bytes() == MEDIA_BYTES
+    assert any(event.stage == "download" and event.status == "finished" for event in listener.events)
+
+
+@pytest.mark.skipif(not shutil.which("yt-dlp"), reason="yt-dlp executable not installed")
+def test_missing_file_fails(media_server, tmp_path):
+    job, _listener = run_one("subprocess", f"{media_server}/missing.mp4", tmp_path)
+    assert job.status == "failed"
@@ -0,0 +1,40 @@
+import os
+import time
+
+from vidsnare.infocache import InfoCache
+
+
+def test_store_and_lookup(tmp_path):
+    cache = InfoCache(str(tmp_path))
+    path = cache.store_info("https://youtu.be/dQw4w9WgXcQ", {"id": "dQw4w9WgXcQ"})
+    assert cache.lookup_info("https://www.youtube.com/watch?v=dQw4w9WgXcQ") == path # Same normalized URL
+    assert cache.lookup_info("https://example.com/other") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_expired_entries_are_deleted(tmp_path):
+    cache = InfoCache(str(tmp_path), ttl=60)
+    cache.store_flat("https://example.com/list", {"entries": []})
+    path = cache.store_info("https://example.com/video", {"id": "v"})
+    old = time.time() - 120
+    os.utime(path, (old, old))
+    assert cache.lookup_info("https://example.com/video") is None
+    assert not os.path.exists(path)
+    assert cache.load_flat("https://example.com/list") == {"entries": []}
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = InfoCache(str(tmp_path), max_bytes=250)
+    filler = "x" * 80
+    a = cache.store_info("https://example.com/a", {"pad": filler})
+    b = cache.store_info("https://example.com/b", {"pad": filler})
+    assert cache.lookup_info("https://example.com/a") == a # a is now the most recently used
+    c = cache.store_info("https://example.com/c", {"pad": filler})
+    assert not os.path.exists(b)
+    assert os.path.exists(a) and os.path.exists(c)
+    assert cache.total_bytes <= 250
+
+
+def test_entries_survive_a_restart(tmp_path):
+    InfoCache(str(tmp_path)).store_info("https://example.com/a", {"id": "a"})
+    assert InfoCache(str(tmp_path)).lookup_info("https://example.com/a")
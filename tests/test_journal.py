@@ -0,0 +1,51 @@
+import json
+
+from vidsnare.journal import JobJournal
+
+
+def record(event, key, **fields):
+    return json.dumps(dict(event=event, key=key, **fields)) + "\n"
+
+
+def submitted(key):
+    return record("submitted", key, url=f"https://example.com/{key}", output_dir="/out", format_option="best_video_audio",
+                  download_playlist=False, number_items=False)
+
+
+def test_load_returns_unfinished_jobs_in_order(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    path.write_text(submitted("a") + submitted("b") + record("running", "a") + submitted("c") +
+                    record("finished", "b") + submitted("d") + record("cancelled", "d") +
+                    '{"event": "finished", "key": "c"', encoding="utf-8") # Torn last line after a crash
+    journal = JobJournal(str(path))
+    try:
+        assert [job["key"] for job in journal.interrupted] == ["a", "c"]
+    finally:
+        journal.close()
+    # Compacted to the unfinished jobs only
+    assert [json.loads(line)["key"] for line in path.read_text(encoding="utf-8").splitlines()] == ["a", "c"]
+
+
+def test_missing_file_has_nothing_to_resume(tmp_path):
+    journal = JobJournal(str(tmp_path / "new.jsonl"))
+    journal.close()
+    assert journal.interrupted == []
+
+
+def test_batched_records_are_written(tmp_path):
+    class Job:
+        def __init__(self, key):
+            self.journal_key = key
+            self.url, self.output_dir, self.format_option = f"https://example.com/{key}", "/out", "audio_mp3"
+            self.download_playlist = self.number_items = False
+            self.status = "finished"
+
+    path = str(tmp_path / "journal.jsonl")
+    journal = JobJournal(path)
+    journal.begin_batch()
+    for key in ("a", "b", "c"):
+        journal.submitted(Job(key))
+    journal.end_batch()
+    journal.ended(Job("b"))
+    journal.close()
+    assert [job["key"] for job in JobJournal(path).interrupted] == ["a", "c"]
@@ -0,0 +1,72 @@
+import threading
+
+from vidsnare.limits import MIN_JOB_RATE, BandwidthBudget, HostLimits, parse_rate
+
+
+class Job:
+    rate_limit = None
+
+
+def test_parse_rate():
+    assert parse_rate("2M") == 2 * 1024 ** 2
+    assert parse_rate("500K") == 500 * 1024
+    assert parse_rate(1000) == 1000
+    assert parse_rate("fast") is None and parse_rate(-1) is None and parse_rate(True) is None
+
+
+def test_fixed_shares_are_sized_by_slots():
+    budget = BandwidthBudget(4000000)
+    jobs = [Job() for _ in range(4)]
+    assert budget.join(jobs[0], slots=4, fixed=True) == 1000000 # A lone job does not take the whole budget
+    for job in jobs[1:]:
+        assert budget.join(job, slots=4, fixed=True) == 1000000
+    assert sum(budget.fixed.values()) <= budget.total_rate
+
+
+def test_fixed_join_waits_until_a_share_is_free():
+    budget = BandwidthBudget(2000000)
+    first, second, late = Job(), Job(), Job()
+    budget.join(first, slots=2, fixed=True)
+    budget.join(second, slots=2, fixed=True)
+    shares = []
+    waiter = threading.Thread(target=lambda: shares.append(budget.join(late, slots=2, fixed=True, poll_interval=0.05)))
+    waiter.start()
+    waiter.join(0.2)
+    assert waiter.is_alive() # Slot count raised while both shares are held
+    budget.leave(first)
+    waiter.join(5)
+    assert shares == [1000000] and first.rate_limit is None
+
+
+def test_fixed_join_returns_none_when_cancelled():
+    budget = BandwidthBudget(1000000)
+    budget.join(Job(), slots=1, fixed=True)
+    assert budget.join(Job(), slots=1, fixed=True, cancelled=lambda: True, poll_interval=0.01) is None
+
+
+def test_adjustable_jobs_split_what_fixed_shares_leave():
+    budget = BandwidthBudget(3000000)
+    fixed, a, b = Job(), Job(), Job()
+    budget.join(fixed, slots=3, fixed=True)
+    budget.join(a)
+    budget.join(b)
+    assert a.rate_limit == b.rate_limit == 1000000
+    budget.leave(fixed)
+    assert a.rate_limit == b.rate_limit == 1500000
+    budget.leave(a)
+    assert b.rate_limit == 3000000
+
+
+def test_shares_never_drop_below_minimum():
+    budget = BandwidthBudget(MIN_JOB_RATE)
+    jobs = [Job() for _ in range(4)]
+    for job in jobs:
+        budget.join(job)
+    assert all(job.rate_limit == MIN_JOB_RATE for job in jobs)
+
+
+def test_host_limits_cover_subdomains():
+    limits = HostLimits(default_limit=0, overrides={"example.com": 2})
+    assert limits.limit_for("cdn.example.com") == 2
+    assert limits.allows("cdn.example.com", 1) and not limits.allows("example.com", 2)
+    assert limits.allows("other.org", 100)
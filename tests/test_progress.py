@@ -0,0 +1,30 @@
+from vidsnare.progress import PROGRESS_PREFIX, parse_progress_line
+
+
+def test_download_record():
+    event = parse_progress_line(PROGRESS_PREFIX + "dl|downloading|1048576|10485760|NA|524288.0|18|NA|3|12|dQw4w9WgXcQ")
+    assert event.stage == "download" and event.status == "downloading"
+    assert event.downloaded_bytes == 1048576 and event.total_bytes == 10485760
+    assert event.speed == 524288.0 and event.eta == 18 and event.fragment_count is None
+    assert (event.playlist_index, event.playlist_count, event.video_id) == (3, 12, "dQw4w9WgXcQ")
+    assert event.overall_fraction() == (2 + 0.1) / 12
+
+
+def test_download_record_falls_back_to_estimate_and_na():
+    event = parse_progress_line(PROGRESS_PREFIX + "dl|downloading|500|NA|1000|NA|NA|NA|NA|NA|NA")
+    assert event.total_bytes == 1000 and event.speed is None and event.video_id is None
+    assert event.fraction == 0.5
+
+
+def test_postprocess_and_done_records():
+    event = parse_progress_line(PROGRESS_PREFIX + "pp|started|Merger|NA|NA|abc")
+    assert (event.stage, event.status, event.postprocessor, event.video_id) == ("postprocess", "started", "Merger", "abc")
+    event = parse_progress_line(PROGRESS_PREFIX + "done|Youtube|abc|1|2|/out/01 - A|B [abc].mp4")
+    assert (event.stage, event.extractor, event.video_id) == ("done", "Youtube", "abc")
+    assert event.filepath == "/out/01 - A|B [abc].mp4"
+
+
+def test_other_lines_are_not_records():
+    assert parse_progress_line("[download] Destination: x.mp4") is None
+    assert parse_progress_line(PROGRESS_PREFIX + "dl|downloading|1") is None
+    assert parse_progress_line("") is None
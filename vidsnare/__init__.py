@@ -0,0 +1,4 @@
+"""VidSnare: a yt-dlp front end with a headless download engine and a customtkinter GUI."""
+from .engine import DownloadEngine, DownloadJob, DownloadScheduler, EngineListener
+
+__all__ = ["DownloadEngine", "DownloadJob", "DownloadScheduler", "EngineListener"]
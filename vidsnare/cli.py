@@ -0,0 +1,221 @@
+import os
+import sys
+import time
+import argparse
+import threading
+
+from .config import YT_DLP_COMMAND, FORMAT_OPTIONS, load_settings, check_ffmpeg
+from .engine import DownloadEngine, EngineListener
+from .limits import parse_rate
+from .ingest import DropFolderWatcher, SubmitServer, ingest_options, describe_result
+from .urls import parse_url_lines
+
+
+# --- Console Listener ---
+class ConsoleListener(EngineListener):
+    """Prints engine output to stdout, one line per message, prefixed with the job id."""
+    def __init__(self, quiet=False):
+        self.quiet = quiet
+        self.print_lock = threading.Lock() # Keeps lines from parallel jobs intact
+
+    def emit(self, text):
+        with self.print_lock:
+            print(text, flush=True)
+
+    def on_output(self, job, line):
+        if not self.quiet:
+            self.emit(f"[Job {job.job_id}] {line}")
+
+    def on_job_finished(self, job):
+        self.emit(f"[Job {job.job_id}] {job.status.upper()}: {job.status_text} ({job.url})")
+
+
+def read_urls_file(path):
+    """Reads one URL per line from a file, or from stdin if path is '-'."""
+    if path == '-':
+        return parse_url_lines(sys.stdin)
+    with open(path, 'r', encoding='utf-8') as f:
+        return parse_url_lines(f)
+
+
+def rate_argument(text):
+    """argparse type for --limit-rate."""
+    rate = parse_rate(text)
+    if rate is None:
+        raise argparse.ArgumentTypeError(f"invalid rate: {text!r}")
+    return rate
+
+
+def fragments_argument(text):
+    """argparse type for --concurrent-fragments."""
+    if text == "auto":
+        return text
+    try:
+        return max(1, int(text))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a number or 'auto', got {text!r}")
+
+
+def build_parser(settings):
+    parser = argparse.ArgumentParser(prog="vidsnare --headless", description="Download a batch of URLs with yt-dlp, without the GUI.")
+    parser.add_argument("urls", nargs="*", help="URLs to download (in addition to --urls-file)")
+    parser.add_argument("--urls-file", help="Text file with one URL per line ('-' reads stdin)")
+    parser.add_argument("--output-dir", default=settings["output_directory"], help="Download folder (default: from config)")
+    parser.add_argument("--format", dest="format_option", choices=FORMAT_OPTIONS,
+                        default=settings.get("last_format", "best_video_audio"))
+    parser.add_argument("--playlist", action=argparse.BooleanOptionalAction,
+                        default=settings.get("download_playlist", False), help="Download full playlists")
+    parser.add_argument("--number-items", action=argparse.BooleanOptionalAction,
+                        default=settings.get("number_playlist", False), help="Prefix playlist items with their index")
+    parser.add_argument("--fanout", action=argparse.BooleanOptionalAction, default=settings["playlist_fanout"],
+                        help="Resolve playlists once and download the items as parallel jobs")
+    parser.add_argument("--pipeline-postprocess", action=argparse.BooleanOptionalAction,
+                        default=settings["pipeline_postprocess"],
+                        help="Convert to mp3 in a separate ffmpeg pool while other downloads continue")
+    parser.add_argument("--postprocess-workers", type=int, default=settings["postprocess_workers"],
+                        help="ffmpeg conversions run at the same time (0 = one per CPU core)")
+    parser.add_argument("--workers", type=int, default=settings["max_concurrent_downloads"], help="Parallel downloads")
+    parser.add_argument("--limit-rate", type=rate_argument, default=settings["max_download_rate"],
+                        help="Total download rate shared by all jobs, e.g. 2M (0 = unlimited)")
+    parser.add_argument("--max-per-host", type=int, default=settings["max_jobs_per_host"],
+                        help="Jobs allowed to run against one host at the same time (0 = unlimited)")
+    parser.add_argument("--concurrent-fragments", type=fragments_argument, default=settings["concurrent_fragments"],
+                        help="Fragments downloaded in parallel for DASH/HLS formats, or 'auto' to tune per host")
+    parser.add_argument("--yt-dlp-command", default=settings.get("yt_dlp_command", YT_DLP_COMMAND), help="yt-dlp executable to run")
+    parser.add_argument("--backend", choices=["subprocess", "inprocess"], default=settings["backend"],
+                        help="Run the yt-dlp executable per job, or use the yt_dlp package in this process")
+    parser.add_argument("--index-file", default=settings["index_file"],
+                        help="SQLite index of completed downloads, used to skip them ('' disables)")
+    parser.add_argument("--rebuild-index", action="store_true",
+                        help="Sync the index with the files in --output-dir before downloading")
+    parser.add_argument("--journal-file", default=settings["journal_file"],
+                        help="Job journal used to resume interrupted jobs ('' disables)")
+    parser.add_argument("--info-cache-dir", default=settings["info_cache_dir"],
+                        help="Folder caching extracted info JSON, so re-runs skip extraction ('' disables)")
+    parser.add_argument("--refresh-info", action="store_true", help="Drop cached info for the given URLs and extract them again")
+    parser.add_argument("--clear-info-cache", action="store_true", help="Empty the info cache before downloading")
+    parser.add_argument("--metrics-file", default=settings["metrics_file"],
+                        help="Append per-job timing records to this JSON-lines file")
+    parser.add_argument("--metrics-port", type=int, default=settings["metrics_port"],
+                        help="Serve Prometheus metrics at http://127.0.0.1:PORT/metrics (0 = off)")
+    parser.add_argument("--watch-folder", default=settings["drop_folder"],
+                        help="Keep running and queue the URLs of .txt lists dropped into this folder")
+    parser.add_argument("--submit-port", type=int, default=settings["submit_port"],
+                        help="Keep running and accept URLs POSTed to http://127.0.0.1:<port>/submit (0 = off)")
+    parser.add_argument("--submit-socket", default=settings["submit_socket"],
+                        help="Keep running and accept URLs POSTed to /submit over this Unix socket")
+    parser.add_argument("--no-resume", action="store_true", help="Do not re-queue jobs interrupted in a previous run")
+    parser.add_argument("--quiet", action="store_true", help="Only print a line per finished job")
+    return parser
+
+
+def main(argv=None):
+    """Entry point for `code.py --headless`. Returns the process exit code."""
+    settings = load_settings()
+    args = build_parser(settings).parse_args(argv)
+
+    urls = list(args.urls)
+    if args.urls_file:
+        try:
+            urls.extend(read_urls_file(args.urls_file))
+        except OSError as e:
+            print(f"[Error] Could not read URLs file '{args.urls_file}': {e}", file=sys.stderr)
+            return 2
+    serving = bool(args.watch_folder or args.submit_port or args.submit_socket) # Run until Ctrl+C
+    if not urls and not serving and not args.rebuild_index and (args.no_resume or not args.journal_file):
+        print("[Error] No URLs given. Pass URLs, --urls-file, --watch-folder or --submit-port.", file=sys.stderr)
+        return 2
+
+    try:
+        os.makedirs(args.output_dir, exist_ok=True)
+    except OSError as e:
+        print(f"[Error] Invalid output directory: {e}", file=sys.stderr)
+        return 2
+
+    listener = ConsoleListener(args.quiet)
+    engine = DownloadEngine(max_workers=args.workers, listener=listener,
+                            ffmpeg_available=check_ffmpeg(), yt_dlp_command=args.yt_dlp_command, backend=args.backend,
+                            index_file=args.index_file, journal_file=args.journal_file,
+                            playlist_fanout=args.fanout, pipeline_postprocess=args.pipeline_postprocess,
+                            postprocess_workers=args.postprocess_workers,
+                            postprocess_backlog=settings["postprocess_backlog"],
+                            max_download_rate=args.limit_rate, max_jobs_per_host=args.max_per_host,
+                            host_job_limits=settings["host_job_limits"],
+                            concurrent_fragments=args.concurrent_fragments,
+                            fragment_table_file=settings["fragment_table_file"] or None,
+                            concurrent_fragments_min=settings["concurrent_fragments_min"],
+                            concurrent_fragments_max=settings["concurrent_fragments_max"],
+                            info_cache_dir=args.info_cache_dir or None, info_cache_ttl=settings["info_cache_ttl"],
+                            info_cache_max_bytes=settings["info_cache_max_mb"] * 1024 * 1024,
+                            metrics_file=args.metrics_file or None, metrics_port=args.metrics_port)
+    if engine.info_cache:
+        if args.clear_info_cache:
+            print(f"[Info] Info cache cleared: {engine.info_cache.clear()} entries removed.")
+        elif args.refresh_info:
+            for url in urls:
+                engine.info_cache.invalidate(url)
+    if args.rebuild_index:
+        if not engine.index:
+            print("[Error] --rebuild-index needs a download index (--index-file).", file=sys.stderr)
+            return 2
+        added, removed = engine.index.rebuild(args.output_dir)
+        print(f"[Info] Index rebuilt from '{args.output_dir}': {added} added, {removed} removed, {engine.index.count()} total.")
+        if not urls and not serving and args.no_resume:
+            engine.close()
+            return 0
+    if not args.no_resume:
+        resumed = engine.resume_interrupted()
+        if resumed:
+            print(f"[Info] Resuming {len(resumed)} interrupted job(s) from the journal.")
+
+    # --- Bulk Ingestion ---
+    defaults = {"output_dir": args.output_dir, "format_option": args.format_option,
+                "download_playlist": args.playlist, "number_items": args.number_items}
+    def submit_urls(urls, source, options=None):
+        result = engine.ingest(urls, **ingest_options(options, defaults))
+        if not args.quiet or result.invalid:
+            for line in describe_result(result, source):
+                listener.emit(line)
+        return result
+
+    if urls:
+        submit_urls(urls, "Command line")
+    watcher = server = None
+    try:
+        if args.watch_folder:
+            watcher = DropFolderWatcher(args.watch_folder, submit_urls)
+            print(f"[Info] Watching '{args.watch_folder}' for URL lists.")
+        if args.submit_port or args.submit_socket:
+            server = SubmitServer(engine, submit_urls, args.submit_port, args.submit_socket or None,
+                                  settings["submit_token"] or None)
+            where = [f"http://127.0.0.1:{server.port}/submit"] if server.port else []
+            where += [f"unix:{server.socket_path}"] if server.socket_path else []
+            print(f"[Info] Accepting URLs at {' and '.join(where)}.")
+    except OSError as e:
+        print(f"[Error] Could not start bulk ingestion: {e}", file=sys.stderr)
+        if watcher: watcher.close()
+        engine.shutdown()
+        engine.close()
+        return 2
+
+    interrupted = False
+    try:
+        if serving:
+            while True: time.sleep(0.5) # Runs until Ctrl+C
+        while not engine.wait(timeout=0.5): pass # Short waits keep Ctrl+C responsive
+    except KeyboardInterrupt:
+        interrupted = True
+    if watcher: # Stop taking new URLs before stopping the jobs
+        watcher.close()
+    if server:
+        server.close()
+    if interrupted and engine.active_jobs():
+        print("[Info] Interrupted, stopping all jobs. They will resume on the next run.", file=sys.stderr)
+        engine.shutdown()
+    engine.close()
+
+    if engine.info_cache and not args.quiet:
+        print(f"[Info] Info cache: {engine.info_cache.stats()}.")
+    counts = engine.status_counts() # Top-level jobs; playlist items count via their playlist
+    print(f"[Info] {counts['finished']} finished, {counts['failed']} failed, {counts['cancelled']} cancelled.")
+    return 0 if counts['finished'] == sum(counts.values()) else 1
@@ -0,0 +1,130 @@
+import os
+import json
+import shutil  # For checking ffmpeg presence
+
+from .limits import parse_rate
+
+# --- Configuration ---
+CONFIG_FILE = "vidsnare_config.json"
+DEFAULT_DOWNLOAD_FOLDER_NAME = "VidSnareDownloads" # Folder name in user's home directory
+# If yt-dlp is not in PATH, set the full path here:
+YT_DLP_COMMAND = "yt-dlp" # Assumes yt-dlp is in PATH
+DEFAULT_MAX_CONCURRENT_DOWNLOADS = 2 # Worker slots used when the config has no value
+DEFAULT_BACKEND = "subprocess" # "subprocess" runs the yt-dlp executable, "inprocess" uses the yt_dlp package
+DEFAULT_LOG_MAX_LINES = 2000 # Lines kept in the output pane; older lines are dropped
+DEFAULT_INDEX_FILE = "vidsnare_index.db" # SQLite record of completed downloads; "" disables it
+DEFAULT_JOURNAL_FILE = "vidsnare_jobs.jsonl" # Job journal kept next to the config file; "" disables it
+DEFAULT_FRAGMENT_TABLE_FILE = "vidsnare_fragments.json" # Tuned concurrent-fragment counts per host
+DEFAULT_INFO_CACHE_DIR = "vidsnare_info_cache" # Cached extraction results; "" disables the cache
+FORMAT_OPTIONS = ("best_video_audio", "audio_mp3")
+
+# --- Output Templates ---
+OUTPUT_TEMPLATE = '%(title)s [%(id)s].%(ext)s'
+NUMBERED_OUTPUT_TEMPLATE = '%(playlist_index)s - %(title)s [%(id)s].%(ext)s'
+
+
+def setup_default_download_dir():
+    """Creates and returns the path to the default download directory."""
+    home_dir = os.path.expanduser("~") # Get user's home directory
+    download_dir = os.path.join(home_dir, DEFAULT_DOWNLOAD_FOLDER_NAME)
+    try:
+        # Create the directory if it doesn't exist
+        os.makedirs(download_dir, exist_ok=True)
+        return download_dir
+    except OSError as e:
+        print(f"[Error] Could not create default download directory '{download_dir}': {e}")
+        # Fallback to current working directory if creation fails
+        return os.getcwd()
+
+
+def check_ffmpeg():
+    """Checks if ffmpeg executable is found in PATH."""
+    ffmpeg_available = shutil.which("ffmpeg") is not None
+    if not ffmpeg_available:
+        print("[Warning] ffmpeg not found in PATH. Audio extraction/conversion might fail.")
+    return ffmpeg_available
+
+
+def output_template_for(download_playlist, number_items):
+    """Returns the yt-dlp output filename template for the playlist options."""
+    if download_playlist and number_items:
+        return NUMBERED_OUTPUT_TEMPLATE
+    return OUTPUT_TEMPLATE
+
+
+def get_int_setting(settings, key, default, minimum=None):
+    """Returns settings[key] as an int, falling back to default if missing or invalid."""
+    try:
+        value = int(settings.get(key, default))
+    except (TypeError, ValueError):
+        value = default
+    if minimum is not None:
+        value = max(minimum, value)
+    return value
+
+
+def load_settings(default_download_dir=None):
+    """Loads settings from the JSON config file and fills in defaults."""
+    try:
+        with open(CONFIG_FILE, 'r') as f:
+            settings = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        settings = {} # Start fresh if file missing or invalid
+        print(f"[Info] Config file '{CONFIG_FILE}' not found or invalid. Using defaults.")
+    # Output directory defaults to the dedicated folder if not found in settings
+    if "output_directory" not in settings:
+        settings["output_directory"] = default_download_dir or setup_default_download_dir()
+    # Number of downloads allowed to run at the same time
+    settings["max_concurrent_downloads"] = get_int_setting(settings, "max_concurrent_downloads", DEFAULT_MAX_CONCURRENT_DOWNLOADS, minimum=1)
+    # Output pane cap, and an optional file receiving the full, untrimmed log
+    settings["log_max_lines"] = get_int_setting(settings, "log_max_lines", DEFAULT_LOG_MAX_LINES, minimum=100)
+    settings.setdefault("log_file", "")
+    settings.setdefault("index_file", DEFAULT_INDEX_FILE)
+    settings.setdefault("playlist_fanout", True) # Resolve playlists once and run the items in parallel
+    # mp3 conversion in a separate ffmpeg pool while downloads continue (0 workers = one per CPU core,
+    # 0 backlog = twice the workers; downloads wait once that many files are queued for conversion)
+    settings.setdefault("pipeline_postprocess", True)
+    settings["postprocess_workers"] = get_int_setting(settings, "postprocess_workers", 0, minimum=0)
+    settings["postprocess_backlog"] = get_int_setting(settings, "postprocess_backlog", 0, minimum=0)
+    # Bandwidth budget shared by all downloads (bytes/sec or e.g. "2M"; 0 = unlimited) and per-host job caps
+    rate = parse_rate(settings.get("max_download_rate", 0))
+    if rate is None:
+        print(f"[Warning] Invalid max_download_rate {settings['max_download_rate']!r}. Downloads are not rate limited.")
+    settings["max_download_rate"] = rate or 0
+    settings["max_jobs_per_host"] = get_int_setting(settings, "max_jobs_per_host", 0, minimum=0)
+    host_limits = settings.get("host_job_limits")
+    if not isinstance(host_limits, dict):
+        host_limits = {}
+    settings["host_job_limits"] = {host: get_int_setting(host_limits, host, 0, minimum=0) for host in host_limits}
+    # Concurrent fragments for DASH/HLS downloads: "auto" tunes them per host within the bounds, a number fixes them
+    settings.setdefault("concurrent_fragments", "auto")
+    if settings["concurrent_fragments"] != "auto":
+        settings["concurrent_fragments"] = get_int_setting(settings, "concurrent_fragments", 1, minimum=1)
+    settings["concurrent_fragments_min"] = get_int_setting(settings, "concurrent_fragments_min", 1, minimum=1)
+    settings["concurrent_fragments_max"] = get_int_setting(settings, "concurrent_fragments_max", 16, minimum=settings["concurrent_fragments_min"])
+    settings.setdefault("fragment_table_file", os.path.join(os.path.dirname(CONFIG_FILE), DEFAULT_FRAGMENT_TABLE_FILE))
+    # Cache of extracted info JSON: entries expire after info_cache_ttl seconds, the folder is kept under info_cache_max_mb
+    settings.setdefault("info_cache_dir", os.path.join(os.path.dirname(CONFIG_FILE), DEFAULT_INFO_CACHE_DIR))
+    settings["info_cache_ttl"] = get_int_setting(settings, "info_cache_ttl", 3600, minimum=0)
+    settings["info_cache_max_mb"] = get_int_setting(settings, "info_cache_max_mb", 64, minimum=1)
+    # Per-job timing records (JSON lines) and a local Prometheus endpoint on 127.0.0.1 (0 = off)
+    settings.setdefault("metrics_file", "")
+    settings["metrics_port"] = get_int_setting(settings, "metrics_port", 0, minimum=0)
+    # Bulk ingestion: a folder polled for .txt URL lists, and a local submit endpoint (TCP on 127.0.0.1 and/or a Unix socket)
+    settings.setdefault("drop_folder", "")
+    settings["submit_port"] = get_int_setting(settings, "submit_port", 0, minimum=0)
+    settings.setdefault("submit_socket", "")
+    settings.setdefault("submit_token", "")
+    settings.setdefault("journal_file", os.path.join(os.path.dirname(CONFIG_FILE), DEFAULT_JOURNAL_FILE))
+    if settings.get("backend") not in ("subprocess", "inprocess"):
+        settings["backend"] = DEFAULT_BACKEND
+    return settings
+
+
+def save_settings(settings):
+    """Saves settings to the JSON config file."""
+    try:
+        with open(CONFIG_FILE, 'w') as f:
+            json.dump(settings, f, indent=4)
+    except IOError as e:
+        print(f"[Error] Could not save settings to '{CONFIG_FILE}': {e}")
@@ -0,0 +1,856 @@
+import os
+import json
+import uuid
+import tempfile
+import threading
+import subprocess
+import collections
+
+from .config import YT_DLP_COMMAND, DEFAULT_MAX_CONCURRENT_DOWNLOADS, DEFAULT_BACKEND, OUTPUT_TEMPLATE, FORMAT_OPTIONS, output_template_for
+from .progress import build_progress_args, parse_progress_line, describe_event, format_bytes
+from .inprocess import InProcessBackend, inprocess_available
+from .index import DownloadIndex
+from .journal import JobJournal
+from .postprocess import TranscodePool
+from .fragments import FragmentTuner, MIN_SPEED_SAMPLES
+from .infocache import InfoCache
+from .ingest import IngestResult
+from .urls import normalize_url, video_key
+from .metrics import JobMetrics, MetricsRecorder, MetricsServer, describe_timings
+from .limits import BandwidthBudget, HostLimits, host_key
+from .process import POLL_INTERVAL, OutputReader, popen_options, signal_tree, stop_tree
+
+# --- Download Job ---
+class DownloadJob:
+    """Holds the options, process handle and live state of one queued download."""
+    def __init__(self, job_id, url, output_dir, format_option, download_playlist, number_items,
+                 journal_key=None, parent=None, output_template=None):
+        self.job_id = job_id
+        self.journal_key = journal_key or uuid.uuid4().hex # Stable across restarts, unlike job_id
+        self.resumed = journal_key is not None
+        self.url = url
+        self.output_dir = output_dir
+        self.format_option = format_option
+        self.download_playlist = download_playlist
+        self.number_items = number_items
+        self.output_template = output_template # Overrides the template chosen from the playlist options
+        self.host = host_key(url) # Counted against the per-host job limit
+        self.rate_limit = None # Bytes/sec share of the bandwidth budget while downloading
+        self.concurrent_fragments = None # Fragments fetched in parallel for DASH/HLS formats
+        self.fragmented = False # Set once a progress update reports a fragment count
+        self.speed_total = 0.0 # Sum and count of reported speeds, for the average throughput
+        self.speed_samples = 0
+        self.info_file = None # Cached info JSON the download runs from instead of extracting again
+        self.metrics = JobMetrics() # Phase timestamps, bytes and speeds
+        self.metrics.mark("submitted")
+
+        # --- Playlist Fan-Out ---
+        self.parent = parent # Playlist job this item belongs to
+        self.children = [] # Item jobs of an expanded playlist
+        self.expanded = False # True once the items run as their own jobs; the last one finishes this job
+        self.items_total = 0
+        self.items_skipped = 0 # Already in the download index, no job created
+        self.items_done = 0 # Running totals over the items, updated as each one changes (see _update_playlist)
+        self.items_running = 0
+        self.items_progress = 0.0
+        self.items_bytes = 0
+        self.counted = None # (progress, bytes, running, done) this item last added to its playlist's totals
+
+        # --- Pipelined Post-Processing ---
+        self.postprocess_pending = 0 # Files handed to the transcode pool and not converted yet
+        self.postprocess_errors = 0
+        self.awaiting_postprocess = False # Download done; the last conversion finishes this job
+
+        self.process = None
+        self.cancel_requested = threading.Event()
+        self.status = "queued" # queued, running, finished, failed, cancelled
+        self.status_text = "Queued"
+        self.progress = 0.0
+        self.downloaded_bytes = 0 # Bytes of the item currently downloading (sum over items for a playlist)
+        self.last_event = None # Latest ProgressEvent parsed from yt-dlp's output
+        self.return_code = None
+        self.finish_reported = False # Set once on_job_finished has run (journal written, listener told)
+
+    def is_done(self):
+        """Returns True once the job has left the queue for good."""
+        return self.status in ("finished", "failed", "cancelled")
+
+    def cancel(self):
+        """Flags the job as cancelled and terminates its process tree if one is running.
+
+        Returns at once; the job's own thread kills the tree if it does not exit in time.
+        """
+        self.cancel_requested.set()
+        process = self.process
+        if process and process.poll() is None:
+            signal_tree(process)
+            return True
+        return False
+
+
+# --- Download Scheduler ---
+class DownloadScheduler:
+    """Runs queued jobs on a fixed number of worker slots, one thread per running job."""
+    def __init__(self, run_job, max_workers=DEFAULT_MAX_CONCURRENT_DOWNLOADS, on_job_finished=None, on_submit=None,
+                 host_limits=None):
+        self.run_job = run_job # Called as run_job(job) on a worker thread
+        self.host_limits = host_limits # HostLimits; queued jobs for a host at its cap wait, later jobs go first
+        self.on_submit = on_submit # Called as on_submit(job) before the job can start
+        self.on_job_finished = on_job_finished # Called as on_job_finished(job) once its slot is free
+        self.max_workers = max(1, int(max_workers))
+        self.lock = threading.Lock()
+        self.idle = threading.Condition(self.lock)
+        self.pending = collections.deque()
+        self.running = {}
+        self.jobs = {} # Queued, running and unreported jobs; top-level jobs leave once finished
+        self.finished_counts = collections.Counter() # Final status -> top-level jobs finished so far
+        self.next_job_id = 1
+
+    def submit(self, url, output_dir, format_option, download_playlist, number_items, journal_key=None,
+               parent=None, output_template=None):
+        """Creates a job, queues it and starts it right away if a slot is free."""
+        with self.lock:
+            job = DownloadJob(self.next_job_id, url, output_dir, format_option, download_playlist, number_items,
+                              journal_key, parent, output_template)
+            self.next_job_id += 1
+            self.jobs[job.job_id] = job
+        if self.on_submit:
+            self.on_submit(job)
+        with self.lock:
+            self.pending.append(job)
+        self._dispatch()
+        return job
+
+    def set_max_workers(self, max_workers):
+        """Changes the number of worker slots; extra queued jobs start immediately."""
+        with self.lock:
+            self.max_workers = max(1, int(max_workers))
+        self._dispatch()
+
+    def cancel(self, job_id):
+        """Cancels a queued or running job. Returns the job, or None if unknown."""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None or job.is_done():
+                return job
+            was_pending = job in self.pending
+            if was_pending:
+                self.pending.remove(job)
+                job.status = "cancelled"
+                job.status_text = "Cancelled"
+                job.cancel_requested.set()
+        if was_pending:
+            self.finish(job)
+            return job
+        job.cancel() # Running: the worker thread records the final status
+        return job
+
+    def cancel_all(self):
+        """Cancels every queued and running job."""
+        with self.lock:
+            job_ids = list(self.jobs)
+        for job_id in job_ids:
+            self.cancel(job_id)
+
+    def active_jobs(self):
+        """Returns the queued and running jobs, oldest first."""
+        with self.lock:
+            return [job for job in self.jobs.values() if not job.is_done()]
+
+    def status_counts(self):
+        """Returns a Counter of the final statuses of the top-level jobs finished so far."""
+        with self.lock:
+            return collections.Counter(self.finished_counts)
+
+    def finish(self, job):
+        """Reports a job that reached its final status to on_job_finished, then wakes wait_idle().
+
+        Worker threads call this themselves; call it for jobs finished elsewhere (conversions, playlists).
+        """
+        if self.on_job_finished:
+            self.on_job_finished(job)
+        with self.lock:
+            job.finish_reported = True
+            if not job.parent: # Playlist items stay until their playlist is done; it reads their status
+                self.jobs.pop(job.job_id, None)
+                for child in job.children:
+                    self.jobs.pop(child.job_id, None)
+                self.finished_counts[job.status] += 1
+            self.idle.notify_all()
+
+    def wait_idle(self, timeout=None):
+        """Blocks until every job is done and reported to on_job_finished. Returns False on timeout."""
+        with self.lock:
+            return self.idle.wait_for(lambda: not self.running and not self.pending and
+                                      all(job.finish_reported for job in self.jobs.values()), timeout)
+
+    def _next_startable(self):
+        """Returns the oldest pending job whose host is below its limit, or None. Caller holds the lock."""
+        if not self.host_limits:
+            return self.pending[0] if self.pending else None
+        running_per_host = collections.Counter(job.host for job in self.running.values())
+        for job in self.pending:
+            if self.host_limits.allows(job.host, running_per_host[job.host]):
+                return job
+        return None
+
+    def _dispatch(self):
+        """Starts pending jobs while worker slots are free."""
+        with self.lock:
+            to_start = []
+            while self.pending and len(self.running) < self.max_workers:
+                job = self._next_startable()
+                if job is None:
+                    break # Everything queued waits for a busy host
+                self.pending.remove(job)
+                job.metrics.mark("started")
+                job.status = "running"
+                job.status_text = "Starting..."
+                self.running[job.job_id] = job
+                to_start.append(job)
+        for job in to_start:
+            threading.Thread(target=self._worker, args=(job,), daemon=True).start()
+
+    def _worker(self, job):
+        """Runs one job and frees its slot afterwards."""
+        try:
+            self.run_job(job)
+        except Exception as e:
+            print(f"[Error] Job {job.job_id} crashed: {e}")
+            job.status = "failed"
+            job.status_text = f"Error: {e}"
+        finally:
+            job.process = None
+            finished = not (job.expanded or job.awaiting_postprocess) # Finished by the last item / conversion
+            if finished and not job.is_done():
+                job.status = "cancelled" if job.cancel_requested.is_set() else "finished"
+            with self.lock:
+                self.running.pop(job.job_id, None)
+            self._dispatch()
+            if finished:
+                self.finish(job)
+            else:
+                with self.lock:
+                    self.idle.notify_all()
+
+
+# --- Engine Listener ---
+class EngineListener:
+    """Receives engine callbacks on worker threads. Override the methods you need."""
+    def on_output(self, job, line):
+        """Called for every line of yt-dlp output, and for engine messages about the job."""
+
+    def on_job_update(self, job):
+        """Called when a job's status text or progress changes."""
+
+    def on_progress(self, job, event):
+        """Called with each ProgressEvent parsed from yt-dlp's progress records."""
+
+    def on_job_finished(self, job):
+        """Called once a job is done and its worker slot has been released."""
+
+
+# --- Command Building ---
+def build_command(job, ffmpeg_available=True, yt_dlp_command=YT_DLP_COMMAND, archive_file=None, extract_audio=True,
+                  info_template=None):
+    """Returns the yt-dlp argument list for a job.
+
+    archive_file lists videos yt-dlp should skip. With extract_audio=False an mp3 job only
+    downloads the best audio and leaves the conversion to the transcode pool. A job with an
+    info_file runs from that info JSON; otherwise info_template makes yt-dlp write one there.
+    """
+    command = [yt_dlp_command]
+    # --- Add Format Options ---
+    if job.format_option == "best_video_audio":
+        command.extend(['-f', 'bv*+ba/b'])
+    elif job.format_option == "audio_mp3":
+        if not ffmpeg_available:
+            raise RuntimeError("Audio extraction selected, but ffmpeg is not available.")
+        if extract_audio:
+            command.extend(['-x', '--audio-format', 'mp3'])
+        command.extend(['-f', 'ba'])
+    # --- Handle Playlist Options ---
+    if not job.download_playlist:
+        command.extend(['--no-playlist'])
+    # --- Add Output Path ---
+    output_template = job.output_template or output_template_for(job.download_playlist, job.number_items)
+    command.extend(['-o', os.path.join(job.output_dir, output_template)])
+    # --- Add Progress & Other Flags ---
+    command.extend(['--progress', '--newline', '--no-colors', '--continue', '--ignore-errors'])
+    command.extend(build_progress_args())
+    if archive_file:
+        command.extend(['--download-archive', archive_file])
+    if job.rate_limit:
+        command.extend(['--limit-rate', str(job.rate_limit)])
+    if job.concurrent_fragments and job.concurrent_fragments > 1:
+        command.extend(['--concurrent-fragments', str(job.concurrent_fragments)])
+    if job.info_file:
+        command.extend(['--load-info-json', job.info_file])
+        return command
+    if info_template:
+        command.extend(['--write-info-json', '-o', 'infojson:' + info_template])
+    command.append(job.url)
+    return command
+
+
+# --- Download Engine ---
+class DownloadEngine:
+    """Headless download engine: queues jobs, runs yt-dlp and reports back through a listener.
+
+    backend selects how yt-dlp runs: "subprocess" starts the yt-dlp executable per job,
+    "inprocess" drives warm yt_dlp.YoutubeDL instances (falls back to subprocess if the
+    yt_dlp package is not installed). With an index_file, videos already saved are skipped.
+    With a journal_file, jobs interrupted by a crash or shutdown can be resumed on the next start.
+    With playlist_fanout, playlists are resolved once and each item becomes its own job.
+    With pipeline_postprocess, mp3 conversion runs in a separate ffmpeg pool while downloads continue.
+    max_download_rate (bytes/sec) is shared by all downloading jobs; max_jobs_per_host and
+    host_job_limits ({host: limit}) cap the jobs running against one host. concurrent_fragments is
+    a fixed count, or "auto" to tune it per host within the min/max bounds (remembered in fragment_table_file).
+    With an info_cache_dir, extraction results are cached so re-runs and playlist walks skip extraction.
+    Per-job timings go to metrics_file (JSON lines) and, with a metrics_port, to a local Prometheus endpoint.
+    ingest() normalizes URLs and skips those already queued, running or completed; submit() queues as given.
+    """
+    def __init__(self, max_workers=DEFAULT_MAX_CONCURRENT_DOWNLOADS, listener=None,
+                 ffmpeg_available=True, yt_dlp_command=YT_DLP_COMMAND, backend=DEFAULT_BACKEND,
+                 index_file=None, journal_file=None, playlist_fanout=True,
+                 pipeline_postprocess=True, postprocess_workers=0, postprocess_backlog=0,
+                 max_download_rate=0, max_jobs_per_host=0, host_job_limits=None,
+                 concurrent_fragments="auto", fragment_table_file=None, concurrent_fragments_min=1,
+                 concurrent_fragments_max=16, info_cache_dir=None, info_cache_ttl=3600, info_cache_max_bytes=64 * 1024 * 1024,
+                 metrics_file=None, metrics_port=0):
+        self.listener = listener or EngineListener()
+        self.playlist_fanout = playlist_fanout # Run playlist items as separate jobs across the worker slots
+        self.finish_lock = threading.Lock()
+        self.stopping = False # Set by shutdown(); cancelled jobs then stay resumable
+        self.dedup_lock = threading.RLock() # Held from the duplicate check until the job is registered
+        self.submitted_urls = {} # (normalized url, format option, playlist) -> latest job, or its job id once finished
+        self.journal = None
+        if journal_file:
+            try:
+                self.journal = JobJournal(journal_file)
+            except OSError as e:
+                print(f"[Error] Could not open job journal '{journal_file}': {e}")
+        self.index = None
+        if index_file:
+            try:
+                self.index = DownloadIndex(index_file)
+            except Exception as e: # sqlite3.Error or OSError; downloads still work without it
+                print(f"[Error] Could not open download index '{index_file}': {e}")
+        self.ffmpeg_available = ffmpeg_available
+        self.yt_dlp_command = yt_dlp_command
+        self.transcoder = None
+        if pipeline_postprocess and ffmpeg_available:
+            self.transcoder = TranscodePool(workers=postprocess_workers, backlog=postprocess_backlog)
+        self.bandwidth = BandwidthBudget(max_download_rate) if max_download_rate else None
+        self.metrics = None
+        self.metrics_server = None
+        if metrics_file or metrics_port:
+            self.metrics = MetricsRecorder(metrics_file)
+            self.metrics.add_gauge("vidsnare_active_jobs", "Jobs queued or running.", lambda: len(self.active_jobs()))
+            if metrics_port:
+                try:
+                    self.metrics_server = MetricsServer(self.metrics, metrics_port)
+                except OSError as e:
+                    print(f"[Error] Could not start the metrics endpoint on port {metrics_port}: {e}")
+        self.info_cache = None
+        if info_cache_dir:
+            try:
+                self.info_cache = InfoCache(info_cache_dir, info_cache_ttl, info_cache_max_bytes)
+            except OSError as e:
+                print(f"[Error] Could not open info cache '{info_cache_dir}': {e}")
+        self.fragment_tuner = None
+        self.concurrent_fragments = 1
+        if concurrent_fragments == "auto":
+            self.fragment_tuner = FragmentTuner(fragment_table_file, concurrent_fragments_min, concurrent_fragments_max)
+        else:
+            self.concurrent_fragments = max(1, int(concurrent_fragments))
+        host_limits = HostLimits(max_jobs_per_host, host_job_limits) if max_jobs_per_host or host_job_limits else None
+        self.scheduler = DownloadScheduler(self.run_job, max_workers=max_workers,
+                                           on_job_finished=self._job_finished, on_submit=self._job_submitted,
+                                           host_limits=host_limits)
+        self.inprocess = None
+        if backend == "inprocess":
+            if inprocess_available():
+                self.inprocess = InProcessBackend(self)
+            else:
+                print("[Warning] In-process backend selected, but the yt_dlp package is not installed. Using the yt-dlp executable.")
+        self.backend = "inprocess" if self.inprocess else "subprocess"
+
+    # --- Queue API ---
+    def submit(self, url, output_dir, format_option="best_video_audio", download_playlist=False, number_items=False):
+        """Queues a download and returns its DownloadJob."""
+        return self.scheduler.submit(url, output_dir, format_option, download_playlist, number_items)
+
+    def ingest(self, urls, output_dir, format_option="best_video_audio", download_playlist=False, number_items=False):
+        """Normalizes URLs and queues those not already queued, running or completed. Returns an IngestResult.
+
+        Failed and cancelled jobs do not count, so submitting their URL again retries them.
+        """
+        if format_option not in FORMAT_OPTIONS:
+            raise ValueError(f"unknown format {format_option!r}, expected one of {', '.join(FORMAT_OPTIONS)}")
+        result = IngestResult()
+        if self.journal: self.journal.begin_batch() # One journal sync for the whole list
+        try:
+            for text in urls:
+                url = normalize_url(text)
+                if url is None:
+                    result.invalid.append(text)
+                    continue
+                with self.dedup_lock:
+                    reason = self.duplicate_reason(url, format_option, download_playlist)
+                    if reason:
+                        result.duplicates.append((url, reason))
+                        continue
+                    result.jobs.append(self.submit(url, output_dir, format_option, download_playlist, number_items))
+        finally:
+            if self.journal: self.journal.end_batch()
+        return result
+
+    def duplicate_reason(self, url, format_option, download_playlist):
+        """Returns why a normalized URL would be a duplicate (e.g. "running as job 3"), or None."""
+        with self.dedup_lock:
+            job = self.submitted_urls.get((url, format_option, bool(download_playlist)))
+        if isinstance(job, int):
+            return f"finished as job {job}"
+        if job is not None and job.status not in ("failed", "cancelled"):
+            return f"{job.status} as job {job.job_id}"
+        key = None if download_playlist else video_key(url)
+        if key and self.index and self.index.is_completed(key[0], key[1], format_option):
+            return "already in the download index"
+        return None
+
+    def resume_interrupted(self):
+        """Re-queues the jobs the journal lists as unfinished. Returns the new jobs."""
+        if not self.journal:
+            return []
+        jobs = []
+        for record in self.journal.interrupted:
+            jobs.append(self.scheduler.submit(record["url"], record["output_dir"], record["format_option"],
+                                              record["download_playlist"], record["number_items"],
+                                              journal_key=record["key"]))
+        self.journal.interrupted = []
+        return jobs
+
+    def cancel(self, job_id):
+        """Cancels a queued or running job, including the items of an expanded playlist. Returns the job, or None if unknown."""
+        job = self.scheduler.cancel(job_id)
+        if job is not None:
+            for child in list(job.children):
+                self.scheduler.cancel(child.job_id)
+        return job
+
+    def cancel_all(self):
+        """Cancels every queued and running job."""
+        self.scheduler.cancel_all()
+
+    def set_max_workers(self, max_workers):
+        """Changes the number of parallel worker slots."""
+        self.scheduler.set_max_workers(max_workers)
+
+    @property
+    def max_workers(self):
+        return self.scheduler.max_workers
+
+    @property
+    def jobs(self):
+        return self.scheduler.jobs
+
+    def status_counts(self):
+        """Returns a Counter of the final statuses of the top-level jobs finished so far."""
+        return self.scheduler.status_counts()
+
+    def active_jobs(self):
+        """Returns the queued and running jobs, oldest first."""
+        return self.scheduler.active_jobs()
+
+    def wait(self, timeout=None):
+        """Blocks until every submitted job is done. Returns False on timeout."""
+        return self.scheduler.wait_idle(timeout)
+
+    def shutdown(self, timeout=None):
+        """Stops all jobs without marking them cancelled, so they resume on the next start."""
+        self.stopping = True
+        self.scheduler.cancel_all()
+        return self.wait(timeout)
+
+    def close(self):
+        """Releases resources held by the engine. Call after the last job is done."""
+        if self.transcoder:
+            self.transcoder.shutdown()
+        if self.index:
+            self.index.close()
+        if self.journal:
+            self.journal.close()
+        if self.metrics_server:
+            self.metrics_server.close()
+        if self.metrics:
+            self.metrics.close()
+
+    # --- Scheduler Callbacks ---
+    def _job_submitted(self, job):
+        url = normalize_url(job.url) or job.url
+        with self.dedup_lock: # Playlist items count too, so a video already running as one is not queued again
+            self.submitted_urls[(url, job.format_option, bool(job.download_playlist))] = job
+        if self.journal and not job.resumed and not job.parent: # Resumed jobs are already in the journal
+            self.journal.submitted(job)
+
+    def _forget_submitted(self, job):
+        """Keeps only the id of a finished job for duplicate checks; failed and cancelled URLs may be queued again."""
+        key = (normalize_url(job.url) or job.url, job.format_option, bool(job.download_playlist))
+        with self.dedup_lock:
+            if self.submitted_urls.get(key) is not job: # A newer job took over the URL
+                return
+            if job.status == "finished":
+                self.submitted_urls[key] = job.job_id
+            else:
+                del self.submitted_urls[key]
+
+    def _job_finished(self, job):
+        job.metrics.mark("ended")
+        if "spawned" in job.metrics.marks:
+            self.log(job, f"[Timing] {describe_timings(job.metrics)}")
+        if self.metrics:
+            self.metrics.job_finished(job, self.backend)
+        self._forget_submitted(job)
+        if job.parent: # Playlist items are not journaled; resuming the playlist re-queues them
+            self.listener.on_job_finished(job)
+            with self.finish_lock:
+                job.finish_reported = True # The playlist counts the item as done from here on
+            self._update_playlist(job.parent, job)
+            self._finish_playlist_if_done(job.parent)
+            return
+        if self.journal and not (self.stopping and job.status == "cancelled"):
+            self.journal.ended(job)
+        self.listener.on_job_finished(job)
+
+    # --- Job Reporting (used by both backends) ---
+    def log(self, job, text):
+        self.listener.on_output(job, text)
+
+    def set_status(self, job, text, status=None):
+        job.status_text = text
+        if status: job.status = status
+        self.listener.on_job_update(job)
+
+    def report_progress(self, job, event):
+        """Applies a ProgressEvent to the job and notifies the listener."""
+        job.last_event = event
+        job.metrics.observe(event)
+        if event.stage == "download":
+            if event.downloaded_bytes is not None:
+                job.downloaded_bytes = event.downloaded_bytes
+            if event.speed:
+                job.speed_total += event.speed; job.speed_samples += 1
+            if event.fragment_count:
+                job.fragmented = True
+        if event.stage == "done" and event.video_id and event.filepath:
+            if self.is_pipelined(job):
+                self._queue_transcode(job, event) # Recorded in the index once converted
+            elif self.index:
+                self.index.record(event.extractor, event.video_id, job.format_option, event.filepath)
+        overall = event.overall_fraction()
+        if overall is not None: job.progress = overall
+        job.status_text = describe_event(event)
+        self.listener.on_progress(job, event)
+        self.listener.on_job_update(job)
+        if job.parent:
+            self._update_playlist(job.parent, job)
+
+    # --- Fragment Tuning ---
+    def _tune_fragments(self, job):
+        """Feeds a finished fragmented download's average speed back to the fragment tuner."""
+        if not self.fragment_tuner or not job.fragmented or job.speed_samples < MIN_SPEED_SAMPLES:
+            return
+        if job.rate_limit: # Throughput capped by the bandwidth budget says nothing about fragments
+            return
+        average = job.speed_total / job.speed_samples
+        best = self.fragment_tuner.record(job.host, job.concurrent_fragments, average)
+        self.log(job, f"[Fragments] {job.concurrent_fragments} concurrent fragments: {format_bytes(average)}/s average. "
+                      f"Next jobs on {job.host or 'this host'} use {best}.")
+
+    # --- Pipelined Post-Processing ---
+    def is_pipelined(self, job):
+        """Returns True if the job's mp3 conversion runs in the transcode pool instead of inside yt-dlp."""
+        return self.transcoder is not None and job.format_option == "audio_mp3"
+
+    def _queue_transcode(self, job, event):
+        """Hands a downloaded file to the transcode pool. Blocks while the pool's backlog is full."""
+        with self.finish_lock:
+            job.postprocess_pending += 1
+        self.transcoder.submit(event.filepath, lambda output_path, error: self._transcode_done(job, event, output_path, error),
+                               job.cancel_requested.is_set)
+
+    def _transcode_done(self, job, event, output_path, error):
+        """Called on a pool thread when a conversion ended; finishes the job after its last one."""
+        if error:
+            if error != "Cancelled":
+                job.postprocess_errors += 1
+            self.log(job, f"[Convert] {os.path.basename(event.filepath)}: {error}")
+        else:
+            self.log(job, f"[Convert] Saved: {output_path}")
+            if self.index:
+                self.index.record(event.extractor, event.video_id, job.format_option, output_path)
+        with self.finish_lock:
+            job.postprocess_pending -= 1
+            left = job.postprocess_pending
+            finish = left == 0 and job.awaiting_postprocess and not job.is_done()
+        if finish:
+            if job.cancel_requested.is_set():
+                self.set_status(job, "Cancelled", "cancelled")
+            else:
+                self._record_final_status(job)
+            self.scheduler.finish(job)
+        elif job.awaiting_postprocess and not job.is_done():
+            self.set_status(job, f"Converting to mp3 ({left} file(s) left)...")
+
+    # --- Playlist Fan-Out ---
+    def resolve_playlist(self, job):
+        """Flat-extracts a URL with the yt-dlp executable. Returns the info dict, or None on failure."""
+        command = [self.yt_dlp_command, '--flat-playlist', '--dump-single-json', '--no-warnings', job.url]
+        job.process = subprocess.Popen(
+            command, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            text=True, encoding='utf-8', errors='replace', **popen_options()
+        )
+        job.metrics.mark("spawned")
+        while True:
+            if job.cancel_requested.is_set():
+                stop_tree(job.process)
+                return None
+            try:
+                output, errors = job.process.communicate(timeout=POLL_INTERVAL)
+                break
+            except subprocess.TimeoutExpired:
+                continue
+        if job.process.returncode != 0:
+            for line in errors.splitlines():
+                self.log(job, line)
+            return None
+        try:
+            return json.loads(output)
+        except json.JSONDecodeError as e:
+            self.log(job, f"[Playlist] Could not parse flat playlist JSON: {e}")
+            return None
+
+    def run_playlist(self, job):
+        """Resolves a playlist once and queues every entry as its own job.
+
+        Returns False if the URL is not a playlist (or could not be resolved), so the caller
+        downloads it as a single job instead.
+        """
+        self.set_status(job, "Resolving playlist...")
+        info = self.info_cache.load_flat(job.url) if self.info_cache else None
+        if info:
+            self.log(job, f"[Cache] Using cached playlist walk ({self.info_cache.stats()}).")
+        else:
+            info = self.inprocess.resolve_playlist(job) if self.inprocess else self.resolve_playlist(job)
+            if self.info_cache and info and info.get('_type') == 'playlist':
+                self.info_cache.store_flat(job.url, info)
+        if not info or info.get('_type') != 'playlist' or not info.get('entries'):
+            return False
+        entries = [entry for entry in info['entries'] if entry and (entry.get('url') or entry.get('webpage_url'))]
+        width = len(str(len(entries))) # yt-dlp pads playlist_index to the width of the entry count
+        job.items_total = len(entries)
+        self.log(job, f"[Playlist] {info.get('title') or job.url}: {len(entries)} item(s), queued across {self.max_workers} worker slot(s).")
+        for position, entry in enumerate(entries, start=1):
+            if job.cancel_requested.is_set():
+                break
+            if self.index and entry.get('id') and self.index.is_completed(entry.get('ie_key'), entry['id'], job.format_option):
+                job.items_skipped += 1
+                continue
+            output_template = None
+            if job.number_items:
+                playlist_index = entry.get('playlist_index') or position
+                output_template = f"{playlist_index:0{width}d} - {OUTPUT_TEMPLATE}"
+            child = self.scheduler.submit(entry.get('url') or entry.get('webpage_url'), job.output_dir, job.format_option,
+                                          False, False, parent=job, output_template=output_template)
+            job.children.append(child)
+        if job.items_skipped:
+            self.log(job, f"[Playlist] Skipped {job.items_skipped} item(s) already in the download index.")
+        if not job.children and not job.cancel_requested.is_set():
+            job.progress = 1.0
+            self.set_status(job, f"All {job.items_total} playlist item(s) already downloaded.", "finished")
+            return True
+        job.expanded = True
+        self._update_playlist(job)
+        self._finish_playlist_if_done(job)
+        return True
+
+    def _update_playlist(self, job, child=None):
+        """Applies a change of one item (child) to the playlist job's totals and refreshes its status.
+
+        Only the changed item is looked at, so an update costs the same for 10 items as for 1,000.
+        """
+        with self.finish_lock:
+            if job.is_done(): # A slower item must not overwrite the final status
+                return
+            if child is not None:
+                self._count_item(job, child)
+            total = job.items_total or 1
+            job.progress = min(1.0, (job.items_skipped + job.items_progress) / total)
+            job.downloaded_bytes = job.items_bytes
+            skipped = f", {job.items_skipped} skipped" if job.items_skipped else ""
+            job.status_text = (f"Playlist: {job.items_done + job.items_skipped}/{job.items_total} items done{skipped}, "
+                               f"{job.items_running} running, {format_bytes(job.downloaded_bytes)}")
+        self.listener.on_job_update(job)
+
+    def _count_item(self, job, child):
+        """Replaces what an item last added to the playlist's totals with its current state. Caller holds finish_lock."""
+        state = (child.progress, child.downloaded_bytes, child.status == "running", child.finish_reported)
+        old = child.counted or (0.0, 0, False, False)
+        child.counted = state
+        job.items_progress += state[0] - old[0]
+        job.items_bytes += state[1] - old[1]
+        job.items_running += state[2] - old[2]
+        job.items_done += state[3] - old[3]
+
+    def _finish_playlist_if_done(self, job):
+        """Records the playlist's final status once its last item is done and reported."""
+        with self.finish_lock:
+            if job.is_done() or not job.expanded or job.items_done < len(job.children):
+                return
+            statuses = [child.status for child in job.children]
+            failed = statuses.count("failed")
+            if job.cancel_requested.is_set() or "cancelled" in statuses:
+                job.status, job.status_text = "cancelled", "Cancelled"
+            elif failed:
+                job.return_code = 1
+                job.status, job.status_text = "failed", f"Playlist download failed ({failed} of {job.items_total} item(s) failed)"
+            else:
+                job.return_code = 0
+                job.progress = 1.0
+                job.status, job.status_text = "finished", "Playlist download finished successfully!"
+        self.listener.on_job_update(job)
+        self.scheduler.finish(job)
+
+    # --- Job Runner ---
+    def run_job(self, job):
+        """Runs one job on the selected backend and records its final status."""
+        try:
+            if self.journal and not job.parent:
+                self.journal.running(job)
+            if job.parent: # Counts the item as running in its playlist's status
+                self._update_playlist(job.parent, job)
+            if job.resumed:
+                self.log(job, "[Info] Resuming interrupted job; partial files are continued.")
+            if self.index:
+                scanned = self.index.ensure_scanned(job.output_dir)
+                if scanned and any(scanned):
+                    self.log(job, f"[Index] Synced with output folder: {scanned[0]} added, {scanned[1]} removed.")
+            if job.download_playlist and self.playlist_fanout and not job.parent:
+                if self.run_playlist(job) or job.cancel_requested.is_set():
+                    return # Items finish the playlist job; see _finish_playlist_if_done
+            job.concurrent_fragments = self.fragment_tuner.choose(job.host) if self.fragment_tuner else self.concurrent_fragments
+            if self.bandwidth:
+                self.set_status(job, "Waiting for bandwidth...")
+                rate = self.bandwidth.join(job, self.scheduler.max_workers, fixed=not self.inprocess,
+                                           cancelled=job.cancel_requested.is_set)
+                if rate is None: # Cancelled while waiting for a share
+                    self.set_status(job, "Cancelled", "cancelled")
+                    return
+                self.log(job, f"[Limit] Download rate share: {format_bytes(rate)}/s")
+            return_code = self.run_download(job)
+            if job.cancel_requested.is_set():
+                self.set_status(job, "Cancelled", "cancelled")
+                return
+            job.return_code = return_code
+            if return_code == 0:
+                self._tune_fragments(job)
+            with self.finish_lock:
+                if job.postprocess_pending: # The transcode pool finishes the job; the slot is free meanwhile
+                    job.awaiting_postprocess = True
+                    left = job.postprocess_pending
+            if job.awaiting_postprocess:
+                self.set_status(job, f"Converting to mp3 ({left} file(s) left)...")
+                return
+            self._record_final_status(job)
+
+        except FileNotFoundError:
+             self.set_status(job, f"Error: '{self.yt_dlp_command}' not found.", "failed")
+        except RuntimeError as e:
+             self.set_status(job, f"Error: {e}", "failed"); self.log(job, f"Runtime Error: {e}")
+        except Exception as e:
+            error_msg = f"An unexpected error occurred: {e}"; status_msg = "An unexpected error occurred."; print(f"[Error] [Job {job.job_id}] {error_msg}")
+            if job.cancel_requested.is_set(): status_msg = "Cancelled during error."
+            self.set_status(job, status_msg, "cancelled" if job.cancel_requested.is_set() else "failed"); self.log(job, f"Exception Type: {type(e).__name__}"); self.log(job, f"Exception Details: {str(e)}")
+        finally: # Scheduler frees the slot and notifies on_job_finished
+            if self.bandwidth: self.bandwidth.leave(job)
+            if job.process: stop_tree(job.process, timeout=0) # Reaps the tree, including children yt-dlp left behind
+            if job.cancel_requested.is_set() and not job.is_done() and not (job.expanded or job.awaiting_postprocess): self.set_status(job, "Cancelled", "cancelled")
+
+    def _record_final_status(self, job):
+        """Sets a job's finished/failed status from its return code and conversion errors."""
+        final_status = "Playlist download " if job.download_playlist else "Download "
+        if job.return_code == 0 and not job.postprocess_errors:
+            job.progress = 1.0; self.set_status(job, final_status + "finished successfully!", "finished")
+        elif job.return_code == 0:
+            self.set_status(job, f"{final_status}failed (mp3 conversion failed for {job.postprocess_errors} file(s))", "failed")
+        else:
+            self.set_status(job, f"{final_status}failed (Code: {job.return_code})", "failed")
+            self.log(job, f"Error Code: {job.return_code}. Check output above.")
+
+    def run_download(self, job):
+        """Downloads a job on the selected backend, from cached info when there is fresh info for its URL.
+
+        If a download from cached info fails (e.g. expired media URLs), the entry is dropped
+        and the job runs again with a fresh extraction. Returns the exit code, or None if cancelled.
+        """
+        use_cache = self.info_cache is not None and not job.download_playlist # Playlists are cached as flat walks
+        job.info_file = self.info_cache.lookup_info(job.url) if use_cache else None
+        if use_cache:
+            self.log(job, f"[Cache] {'Hit' if job.info_file else 'Miss'}: {job.url} ({self.info_cache.stats()})")
+        while True:
+            return_code = self.inprocess.run(job) if self.inprocess else self.run_subprocess(job)
+            if not job.info_file or return_code in (0, None) or job.cancel_requested.is_set():
+                break
+            self.log(job, "[Cache] Download from cached info failed; extracting again.")
+            self.info_cache.invalidate(job.url)
+            job.info_file = None
+        if use_cache and not job.info_file:
+            self.info_cache.info_written(job.url)
+        return return_code
+
+    def run_subprocess(self, job):
+        """Runs the yt-dlp executable for a job and handles its output. Returns the exit code."""
+        archive_file = None
+        if self.index: # yt-dlp skips whatever is listed in the archive, before extracting it
+            fd, archive_file = tempfile.mkstemp(prefix="vidsnare_archive_", suffix=".txt")
+            os.close(fd)
+            self.index.write_archive(job.format_option, archive_file)
+        try:
+            return self._run_subprocess(job, archive_file)
+        finally:
+            if archive_file:
+                try: os.remove(archive_file)
+                except OSError: pass
+
+    def _run_subprocess(self, job, archive_file):
+        info_template = None
+        if self.info_cache and not job.download_playlist:
+            info_template = self.info_cache.info_template(job.url)
+        command = build_command(job, self.ffmpeg_available, self.yt_dlp_command, archive_file,
+                                extract_audio=not self.is_pipelined(job), info_template=info_template)
+        self.log(job, f"Executing: {' '.join(command)}")
+        # --- Execute ---
+        job.process = subprocess.Popen(
+            command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            text=True, encoding='utf-8', errors='replace',
+            bufsize=1, **popen_options()
+        )
+        job.metrics.mark("spawned")
+        # Lines arrive through a reader thread, so a silent process (stalled extraction, long
+        # ffmpeg merge) cannot keep the loop from noticing a cancel for more than POLL_INTERVAL
+        reader = OutputReader(job.process.stdout)
+        while True:
+            if job.cancel_requested.is_set():
+                stop_tree(job.process)
+                return None
+            line = reader.get()
+            if line is None: break
+            if not line: continue
+            line = line.strip()
+            event = parse_progress_line(line)
+            if event is None:
+                self.log(job, line) # Progress records update the job instead of the log
+                continue
+            self.report_progress(job, event)
+        return job.process.wait()
@@ -0,0 +1,81 @@
+import os
+import json
+import threading
+
+START_FRAGMENTS = 4 # Concurrent fragments for a host with no history yet
+REPROBE_EVERY = 10 # Jobs between re-checks of the next higher value, in case the host got faster
+MIN_SPEED_SAMPLES = 3 # Progress updates needed before a job's throughput counts
+SPEED_SMOOTHING = 0.5 # Weight of the newest measurement in a value's running average
+
+
+# --- Fragment Tuner ---
+class FragmentTuner:
+    """Picks the concurrent-fragment count per host from measured throughput and remembers it.
+
+    Every host keeps the average speed measured for each fragment count it ran with. A new job uses
+    the fastest known count, after first trying double and half of it, so the value climbs on
+    high-latency CDNs and backs off where extra connections do not help. The table is a small
+    JSON file, so later sessions start at the tuned value.
+    """
+    def __init__(self, path=None, minimum=1, maximum=16):
+        self.path = path
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.lock = threading.Lock()
+        self.hosts = self._load() # host -> {"fragments": best, "speeds": {count: bytes/sec}, "jobs": n}
+
+    def _load(self):
+        if not self.path:
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                hosts = json.load(f)
+            return hosts if isinstance(hosts, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"[Warning] Could not read fragment table '{self.path}': {e}. Starting fresh.")
+            return {}
+
+    def _save(self):
+        """Writes the table atomically. Caller holds the lock."""
+        if not self.path:
+            return
+        temp_path = self.path + ".tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.hosts, f, indent=1, sort_keys=True)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"[Error] Could not save fragment table '{self.path}': {e}")
+
+    def _clamp(self, count):
+        return min(self.maximum, max(self.minimum, count))
+
+    def choose(self, host):
+        """Returns the concurrent-fragment count for the next job on a host."""
+        with self.lock:
+            entry = self.hosts.get(host)
+            if not entry:
+                return self._clamp(START_FRAGMENTS)
+            best = self._clamp(entry["fragments"])
+            speeds = entry["speeds"]
+            higher, lower = self._clamp(best * 2), self._clamp(best // 2)
+            if str(higher) not in speeds or (entry["jobs"] % REPROBE_EVERY == 0 and higher != best):
+                return higher
+            if str(lower) not in speeds:
+                return lower
+            return best
+
+    def record(self, host, fragments, average_speed):
+        """Stores a finished job's average speed for the fragment count it used."""
+        with self.lock:
+            entry = self.hosts.setdefault(host, {"fragments": fragments, "speeds": {}, "jobs": 0})
+            speeds = entry["speeds"]
+            key = str(fragments)
+            previous = speeds.get(key)
+            speeds[key] = average_speed if previous is None else previous + SPEED_SMOOTHING * (average_speed - previous)
+            entry["jobs"] += 1
+            entry["fragments"] = int(max(speeds, key=speeds.get))
+            self._save()
+            return entry["fragments"]
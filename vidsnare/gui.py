@@ -0,0 +1,510 @@
+import tkinter as tk
+from tkinter import filedialog
+import customtkinter as ctk
+import os
+import collections
+import subprocess
+import platform # For opening folder cross-platform
+
+from .config import YT_DLP_COMMAND, setup_default_download_dir, check_ffmpeg, load_settings, save_settings
+from .engine import DownloadEngine, EngineListener
+from .logbuffer import LogBuffer
+from .uibatch import UiBatcher
+from .ingest import DropFolderWatcher, SubmitServer, ingest_options, describe_result
+from .urls import parse_url_lines
+
+MAX_FINISHED_ROWS = 200 # Oldest finished jobs leave the jobs panel beyond this many
+
+
+# --- Engine Listener ---
+class GuiListener(EngineListener):
+    """Forwards engine callbacks from worker threads to the Tk thread.
+
+    Output lines and job updates are batched and applied once per UI tick; everything else
+    goes through the UI queue.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    def on_output(self, job, line):
+        self.app.log.append(f"[Job {job.job_id}] {line}")
+
+    def on_job_update(self, job):
+        self.app.batcher.mark_job_dirty(job)
+
+    def on_job_finished(self, job):
+        self.app.queue_ui_update(self.app.on_job_finished, job)
+
+
+# --- Main Application Class ---
+class App(ctk.CTk):
+    def __init__(self):
+        super().__init__()
+
+        self.title("VidSnare - yt-dlp Downloader")
+        self.geometry("650x720") # Taller for the jobs panel
+
+        # --- Internal State ---
+        self.default_download_dir = setup_default_download_dir() # Setup/get default dir path
+        self.job_rows = {} # job_id -> (job, widgets) showing that job in the jobs panel
+        self.finished_rows = collections.deque() # job_ids of finished rows, oldest first
+        self.next_row = 0 # Grid row for the next job row; removed rows leave their row empty
+
+        # --- Load Settings & Check Dependencies ---
+        self.settings = load_settings(self.default_download_dir) # Uses the default dir if no setting saved
+        self.ffmpeg_available = check_ffmpeg()
+        self.log = LogBuffer(self.settings["log_max_lines"], self.settings["log_file"] or None)
+        self.batcher = UiBatcher(self.log, self.observe_ui_latency, self.observe_ui_latency) # Log lines, job changes and calls for the next UI tick
+
+        # --- Download Engine ---
+        self.engine = DownloadEngine(
+            max_workers=self.settings["max_concurrent_downloads"],
+            listener=GuiListener(self),
+            ffmpeg_available=self.ffmpeg_available,
+            yt_dlp_command=self.settings.get("yt_dlp_command", YT_DLP_COMMAND),
+            backend=self.settings["backend"],
+            index_file=self.settings["index_file"],
+            journal_file=self.settings["journal_file"],
+            playlist_fanout=self.settings["playlist_fanout"],
+            pipeline_postprocess=self.settings["pipeline_postprocess"],
+            postprocess_workers=self.settings["postprocess_workers"],
+            postprocess_backlog=self.settings["postprocess_backlog"],
+            max_download_rate=self.settings["max_download_rate"],
+            max_jobs_per_host=self.settings["max_jobs_per_host"],
+            host_job_limits=self.settings["host_job_limits"],
+            concurrent_fragments=self.settings["concurrent_fragments"],
+            fragment_table_file=self.settings["fragment_table_file"] or None,
+            concurrent_fragments_min=self.settings["concurrent_fragments_min"],
+            concurrent_fragments_max=self.settings["concurrent_fragments_max"],
+            info_cache_dir=self.settings["info_cache_dir"] or None,
+            info_cache_ttl=self.settings["info_cache_ttl"],
+            info_cache_max_bytes=self.settings["info_cache_max_mb"] * 1024 * 1024,
+            metrics_file=self.settings["metrics_file"] or None,
+            metrics_port=self.settings["metrics_port"]
+        )
+
+        # --- Create Widgets ---
+        self.create_widgets()
+
+        # --- Resume Jobs Interrupted Last Time ---
+        self.resume_interrupted_jobs()
+
+        # --- Bulk Ingestion (drop folder, submit endpoint) ---
+        self.drop_watcher = None
+        self.submit_server = None
+        self.start_ingestion()
+
+        # --- Start UI Queue Polling ---
+        self.after(100, self.process_ui_queue)
+
+        # --- Handle Window Closing ---
+        self.protocol("WM_DELETE_WINDOW", self.on_closing)
+
+    def save_settings(self):
+        """Saves current settings to the JSON config file."""
+        self.settings["output_directory"] = self.output_path_var.get()
+        self.settings["last_format"] = self.format_var.get()
+        self.settings["download_playlist"] = self.playlist_var.get()
+        self.settings["number_playlist"] = self.numbering_var.get()
+        self.settings["max_concurrent_downloads"] = self.engine.max_workers
+
+        save_settings(self.settings)
+
+    def on_closing(self):
+        """Handles window close event, saves settings."""
+        if self.drop_watcher: self.drop_watcher.close() # No new URLs while shutting down
+        if self.submit_server: self.submit_server.close()
+        if self.engine.active_jobs():
+             self.engine.shutdown(timeout=5) # Unfinished jobs stay in the journal and resume next start
+        self.save_settings()
+        self.log.close()
+        self.engine.close()
+        self.destroy()
+
+    def create_widgets(self):
+        """Creates and lays out all the UI widgets."""
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(7, weight=1) # Adjusted row for output expansion
+
+        # --- URL Input ---
+        row_idx = 0
+        self.url_frame = ctk.CTkFrame(self)
+        self.url_frame.grid(row=row_idx, column=0, padx=10, pady=(10, 5), sticky="ew")
+        self.url_frame.grid_columnconfigure(1, weight=1)
+
+        self.url_label = ctk.CTkLabel(self.url_frame, text="Video URL:")
+        self.url_label.grid(row=0, column=0, padx=5, pady=5)
+
+        self.url_entry = ctk.CTkEntry(self.url_frame, placeholder_text="Enter video URL here")
+        self.url_entry.grid(row=0, column=1, padx=5, pady=5, sticky="ew")
+
+        self.paste_button = ctk.CTkButton(self.url_frame, text="Paste", width=60, command=self.paste_from_clipboard)
+        self.paste_button.grid(row=0, column=2, padx=5, pady=5)
+
+        self.import_button = ctk.CTkButton(self.url_frame, text="Import List...", width=90, command=self.import_url_list)
+        self.import_button.grid(row=0, column=3, padx=(0, 5), pady=5)
+
+        # --- Format Selection ---
+        row_idx += 1
+        self.format_frame = ctk.CTkFrame(self)
+        self.format_frame.grid(row=row_idx, column=0, padx=10, pady=5, sticky="ew")
+        #...(rest of format selection widgets unchanged)...
+        self.format_label = ctk.CTkLabel(self.format_frame, text="Format:")
+        self.format_label.pack(side=tk.LEFT, padx=(5, 15), pady=5)
+        self.format_var = tk.StringVar(value=self.settings.get("last_format", "best_video_audio"))
+        self.radio_video_audio = ctk.CTkRadioButton(self.format_frame, text="Video+Audio (Best)", variable=self.format_var, value="best_video_audio")
+        self.radio_video_audio.pack(side=tk.LEFT, padx=5, pady=5)
+        self.radio_audio_only = ctk.CTkRadioButton(self.format_frame, text="Audio Only (mp3)", variable=self.format_var, value="audio_mp3")
+        self.radio_audio_only.pack(side=tk.LEFT, padx=5, pady=5)
+        if not self.ffmpeg_available:
+            self.radio_audio_only.configure(state="disabled")
+            self.ffmpeg_warning_label = ctk.CTkLabel(self.format_frame, text="(ffmpeg needed)", text_color="gray")
+            self.ffmpeg_warning_label.pack(side=tk.LEFT, padx=(0, 5), pady=5)
+
+        # --- Playlist Options ---
+        row_idx += 1
+        self.playlist_frame = ctk.CTkFrame(self)
+        self.playlist_frame.grid(row=row_idx, column=0, padx=10, pady=5, sticky="ew")
+        #...(rest of playlist widgets unchanged)...
+        self.playlist_label = ctk.CTkLabel(self.playlist_frame, text="Playlist:")
+        self.playlist_label.pack(side=tk.LEFT, padx=(5, 15), pady=5)
+        self.playlist_var = tk.BooleanVar(value=self.settings.get("download_playlist", True))
+        self.playlist_checkbox = ctk.CTkCheckBox(self.playlist_frame, text="Download Full Playlist", variable=self.playlist_var, onvalue=True, offvalue=False)
+        self.playlist_checkbox.pack(side=tk.LEFT, padx=5, pady=5)
+        self.numbering_var = tk.BooleanVar(value=self.settings.get("number_playlist", False))
+        self.numbering_checkbox = ctk.CTkCheckBox(self.playlist_frame, text="Number Items", variable=self.numbering_var, onvalue=True, offvalue=False)
+        self.numbering_checkbox.pack(side=tk.LEFT, padx=5, pady=5)
+
+        # --- Output Directory ---
+        row_idx += 1
+        self.output_frame = ctk.CTkFrame(self)
+        self.output_frame.grid(row=row_idx, column=0, padx=10, pady=5, sticky="ew")
+        self.output_frame.grid_columnconfigure(1, weight=1) # Entry expands
+
+        self.output_label = ctk.CTkLabel(self.output_frame, text="Save To:")
+        self.output_label.grid(row=0, column=0, padx=5, pady=5)
+
+        # Use saved path or the app's default directory
+        saved_output_dir = self.settings.get("output_directory", self.default_download_dir)
+        self.output_path_var = tk.StringVar(value=saved_output_dir)
+
+        self.output_entry = ctk.CTkEntry(self.output_frame, textvariable=self.output_path_var)
+        self.output_entry.grid(row=0, column=1, padx=5, pady=5, sticky="ew")
+
+        self.browse_button = ctk.CTkButton(self.output_frame, text="Browse...", width=90, command=self.browse_directory)
+        self.browse_button.grid(row=0, column=2, padx=(5,0), pady=5) # Adjusted padding
+
+        # --- NEW: Open Folder Button ---
+        self.open_folder_button = ctk.CTkButton(self.output_frame, text="Open", width=60, command=self.open_output_folder)
+        self.open_folder_button.grid(row=0, column=3, padx=(5,5), pady=5) # Added to the right
+
+        # --- Action Buttons ---
+        row_idx += 1
+        self.button_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.button_frame.grid(row=row_idx, column=0, padx=10, pady=5)
+        #...(rest of action buttons unchanged)...
+        self.download_button = ctk.CTkButton(self.button_frame, text="Download", command=self.start_download_thread)
+        self.download_button.pack(side=tk.LEFT, padx=5)
+        self.cancel_button = ctk.CTkButton(self.button_frame, text="Cancel All", command=self.cancel_download, state="disabled")
+        self.cancel_button.pack(side=tk.LEFT, padx=5)
+        self.clear_button = ctk.CTkButton(self.button_frame, text="Clear Finished", command=self.clear_finished_rows)
+        self.clear_button.pack(side=tk.LEFT, padx=5)
+        self.workers_label = ctk.CTkLabel(self.button_frame, text="Parallel:")
+        self.workers_label.pack(side=tk.LEFT, padx=(15, 5))
+        self.workers_var = tk.StringVar(value=str(self.engine.max_workers))
+        self.workers_menu = ctk.CTkOptionMenu(self.button_frame, values=[str(n) for n in range(1, 9)], variable=self.workers_var, width=60, command=self.change_max_workers)
+        self.workers_menu.pack(side=tk.LEFT, padx=5)
+
+        # --- Progress Display ---
+        row_idx += 1
+        self.progress_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.progress_frame.grid(row=row_idx, column=0, padx=10, pady=(0, 5), sticky="ew")
+        self.progress_frame.grid_columnconfigure(0, weight=1)
+        #...(rest of progress widgets unchanged)...
+        self.progress_label = ctk.CTkLabel(self.progress_frame, text="Status: Idle")
+        self.progress_label.grid(row=0, column=0, padx=5, sticky="w")
+        self.progress_bar = ctk.CTkProgressBar(self.progress_frame)
+        self.progress_bar.set(0)
+        self.progress_bar.grid(row=1, column=0, padx=5, pady=(0, 5), sticky="ew")
+
+        # --- Jobs Panel ---
+        row_idx += 1
+        self.jobs_frame = ctk.CTkScrollableFrame(self, height=90, label_text="Jobs")
+        self.jobs_frame.grid(row=row_idx, column=0, padx=10, pady=(0, 5), sticky="ew")
+        self.jobs_frame.grid_columnconfigure(0, weight=1)
+
+        # --- Output Text Area ---
+        row_idx += 1
+        self.output_text = ctk.CTkTextbox(self, height=150)
+        self.output_text.grid(row=row_idx, column=0, padx=10, pady=(0, 10), sticky="nsew")
+        self.output_text.configure(state="disabled")
+
+    def paste_from_clipboard(self):
+        """Inserts a clipboard URL into the URL entry, or queues every URL if the clipboard holds a list."""
+        try:
+            clipboard_content = self.clipboard_get()
+        except tk.TclError:
+            self.update_status("Clipboard is empty or does not contain text.", error=True)
+            return
+        urls = parse_url_lines(clipboard_content.splitlines())
+        if len(urls) > 1:
+            self.queue_urls(urls, "Pasted list")
+            return
+        self.url_entry.delete(0, tk.END)
+        self.url_entry.insert(0, clipboard_content.strip())
+
+    def import_url_list(self):
+        """Queues the URLs of a text file, one per line."""
+        path = filedialog.askopenfilename(title="Import URL List", filetypes=[("Text files", "*.txt"), ("All files", "*.*")])
+        if not path: return
+        try:
+            with open(path, 'r', encoding='utf-8-sig') as f:
+                urls = parse_url_lines(f)
+        except (OSError, UnicodeDecodeError) as e:
+            self.update_status(f"Could not read URL list: {e}", error=True)
+            return
+        if not urls:
+            self.update_status("No URLs found in that file.", error=True)
+            return
+        self.queue_urls(urls, f"Imported {os.path.basename(path)}")
+
+    def browse_directory(self):
+        """Opens a dialog to select the output directory."""
+        dir_path = filedialog.askdirectory(initialdir=self.output_path_var.get(), title="Select Download Folder")
+        if dir_path:
+            self.output_path_var.set(dir_path)
+
+    def open_output_folder(self):
+        """Opens the currently selected output directory in the system file explorer."""
+        folder_path = self.output_path_var.get()
+        if not os.path.isdir(folder_path):
+            self.update_status(f"Error: Directory not found: {folder_path}", error=True)
+            return
+
+        try:
+            current_os = platform.system()
+            if current_os == "Windows":
+                os.startfile(folder_path) # Preferred way on Windows
+            elif current_os == "Darwin": # macOS
+                subprocess.run(["open", folder_path], check=True)
+            else: # Linux and other Unix-like
+                subprocess.run(["xdg-open", folder_path], check=True)
+            self.update_status("Opened output folder.") # Feedback
+        except FileNotFoundError:
+            # Handle case where 'open' or 'xdg-open' might not be available
+            self.update_status(f"Error: Could not find command to open folder on this OS.", error=True)
+        except subprocess.CalledProcessError as e:
+            # Handle errors from the subprocess command itself
+             self.update_status(f"Error opening folder: {e}", error=True)
+        except Exception as e:
+            # Catch any other unexpected errors
+             self.update_status(f"An unexpected error occurred opening the folder: {e}", error=True)
+
+
+    def start_download_thread(self):
+        """Validates input and submits the download to the job queue."""
+        video_url = self.url_entry.get().strip()
+        if not video_url:
+            self.update_status("Please enter a video URL.", error=True)
+            return
+        if self.queue_urls(parse_url_lines([video_url]) or [video_url], "URL entry") is not None:
+            self.url_entry.delete(0, tk.END) # Ready for the next URL
+
+    def queue_urls(self, urls, source):
+        """Queues URLs with the current UI options, skipping duplicates. Returns the IngestResult, or None on bad input."""
+        try:
+            # Creates the output folder if it doesn't exist (e.g., user typed a new path)
+            result = self.engine.ingest(urls, **ingest_options(None, self.current_ingest_defaults()))
+        except ValueError as e:
+            self.update_status(f"Invalid input: {e}", error=True)
+            return None
+        self.show_ingested(result, source)
+        return result
+
+    def current_ingest_defaults(self):
+        return {"output_dir": self.output_path_var.get(), "format_option": self.format_var.get(),
+                "download_playlist": self.playlist_var.get(), "number_items": self.numbering_var.get()}
+
+    def show_ingested(self, result, source):
+        """Adds rows for newly queued jobs and logs what was skipped."""
+        for job in result.jobs:
+            self.add_job_row(job)
+        if len(result.jobs) == 1 and not (result.duplicates or result.invalid):
+            self.log_job_options(result.jobs[0])
+        else:
+            for line in describe_result(result, source):
+                self.append_output(line)
+        if not result.jobs:
+            self.update_status("Already queued or downloaded." if result.duplicates else "Nothing to download.",
+                               error=bool(result.invalid))
+            return
+        self.cancel_button.configure(state="normal")
+        self.refresh_overall_status()
+
+    def log_job_options(self, job):
+        """Logs the options a single queued job runs with."""
+        self.append_output(f"[Job {job.job_id}] URL: {job.url}")
+        self.append_output(f"[Job {job.job_id}] Format: {job.format_option}")
+        self.append_output(f"[Job {job.job_id}] Playlist Mode: {'Full Playlist' if job.download_playlist else 'Single Video'}")
+        if job.download_playlist:
+             self.append_output(f"[Job {job.job_id}] Numbering: {'Enabled' if job.number_items else 'Disabled'}")
+        self.append_output(f"[Job {job.job_id}] Saving to: {job.output_dir}")
+        self.append_output("-" * 20)
+
+    def start_ingestion(self):
+        """Starts the drop folder watcher and submit endpoint configured in the settings."""
+        self.ingest_defaults = self.current_ingest_defaults() # Snapshot the background threads read; Tk variables are Tk-thread only
+        for var in (self.output_path_var, self.format_var, self.playlist_var, self.numbering_var):
+            var.trace_add("write", lambda *_: setattr(self, "ingest_defaults", self.current_ingest_defaults()))
+        try:
+            if self.settings["drop_folder"]:
+                self.drop_watcher = DropFolderWatcher(self.settings["drop_folder"], self.submit_from_background)
+                self.append_output(f"[Info] Watching '{self.settings['drop_folder']}' for URL lists.")
+            if self.settings["submit_port"] or self.settings["submit_socket"]:
+                self.submit_server = SubmitServer(self.engine, self.submit_from_background, self.settings["submit_port"],
+                                                  self.settings["submit_socket"] or None, self.settings["submit_token"] or None)
+                self.append_output("[Info] Accepting URLs from other tools at /submit.")
+        except OSError as e:
+            self.append_output(f"[Error] Could not start bulk ingestion: {e}")
+
+    def submit_from_background(self, urls, source, options=None):
+        """Queues URLs from the drop folder or submit endpoint (runs on their threads)."""
+        result = self.engine.ingest(urls, **ingest_options(options, self.ingest_defaults))
+        self.queue_ui_update(self.show_ingested, result, source)
+        return result
+
+    def resume_interrupted_jobs(self):
+        """Re-queues the jobs that were still running or queued when VidSnare last exited."""
+        jobs = self.engine.resume_interrupted()
+        if not jobs: return
+        for job in jobs:
+            self.add_job_row(job)
+        self.cancel_button.configure(state="normal")
+        self.append_output(f"[Info] Resuming {len(jobs)} interrupted job(s) from the last session.")
+        self.refresh_overall_status()
+
+    def change_max_workers(self, value):
+        """Applies a new worker slot count chosen in the UI."""
+        self.engine.set_max_workers(int(value))
+        self.refresh_overall_status()
+
+    def cancel_download(self):
+        """Requests cancellation of every queued and running download."""
+        active_jobs = [job for job in self.engine.active_jobs() if not job.parent]
+        if not active_jobs:
+             print("[Debug] No active jobs to cancel.")
+             self.cancel_button.configure(state="disabled")
+             return
+        self.update_status("Cancelling...")
+        self.cancel_button.configure(state="disabled")
+        for job in active_jobs:
+            self.cancel_job(job.job_id)
+
+    def cancel_job(self, job_id):
+        """Requests cancellation of a single queued or running download."""
+        try:
+            job = self.engine.cancel(job_id)
+        except ProcessLookupError:
+            self.append_output(f"[Job {job_id}] [Warning] Process already finished before termination.")
+            return
+        except Exception as e:
+            self.append_output(f"[Job {job_id}] [Error] Could not terminate process: {e}")
+            return
+        if job is not None and job.status == "running":
+            self.append_output(f"[Job {job_id}] [Info] Cancellation requested. Terminating process...")
+
+    # --- Jobs Panel ---
+    def add_job_row(self, job):
+        """Adds a row with label, progress bar and cancel button for a job."""
+        row = ctk.CTkFrame(self.jobs_frame, fg_color="transparent")
+        row.grid(row=self.next_row, column=0, sticky="ew")
+        self.next_row += 1
+        row.grid_columnconfigure(0, weight=1)
+        label = ctk.CTkLabel(row, text="", anchor="w")
+        label.grid(row=0, column=0, padx=5, sticky="ew")
+        bar = ctk.CTkProgressBar(row, width=120)
+        bar.grid(row=0, column=1, padx=5)
+        button = ctk.CTkButton(row, text="X", width=28, command=lambda: self.cancel_job(job.job_id))
+        button.grid(row=0, column=2, padx=5)
+        self.job_rows[job.job_id] = (job, row, label, bar, button)
+        self.update_job_row(job)
+        if job.is_done(): self.mark_row_finished(job) # Finished before its row was added (background submits)
+
+    def update_job_row(self, job):
+        """Refreshes the jobs panel row for a job from its current state."""
+        widgets = self.job_rows.get(job.job_id)
+        if not widgets: return
+        _, _, label, bar, button = widgets
+        short_url = job.url if len(job.url) <= 40 else job.url[:37] + "..."
+        color = "red" if job.status == "failed" else ("gray" if job.status == "cancelled" else "white")
+        label.configure(text=f"#{job.job_id} {short_url} - {job.status_text}", text_color=color)
+        bar.set(max(0.0, min(1.0, job.progress)))
+        if job.is_done(): button.configure(state="disabled")
+        self.batcher.overall_dirty = True
+
+    def on_job_finished(self, job):
+        """Updates the UI once the scheduler has released a job's worker slot."""
+        self.update_job_row(job)
+        self.mark_row_finished(job)
+        if not self.engine.active_jobs():
+            self.cancel_button.configure(state="disabled")
+
+    def mark_row_finished(self, job):
+        """Lets a finished job's row be cleared, dropping the oldest finished rows beyond MAX_FINISHED_ROWS."""
+        if job.job_id not in self.job_rows or job.job_id in self.finished_rows: return
+        self.finished_rows.append(job.job_id)
+        while len(self.finished_rows) > MAX_FINISHED_ROWS:
+            self.remove_job_row(self.finished_rows.popleft())
+
+    def remove_job_row(self, job_id):
+        widgets = self.job_rows.pop(job_id, None)
+        if widgets: widgets[1].destroy()
+
+    def clear_finished_rows(self):
+        """Removes the rows of finished, failed and cancelled jobs from the jobs panel."""
+        while self.finished_rows:
+            self.remove_job_row(self.finished_rows.popleft())
+        self.refresh_overall_status()
+
+    def refresh_overall_status(self):
+        """Shows queue totals in the status line and average progress in the main bar."""
+        active_jobs = [job for job in self.engine.active_jobs() if not job.parent] # Playlist items show via their playlist
+        if not active_jobs:
+            failed = sum(1 for job, *_ in self.job_rows.values() if job.status == "failed") # Rows still shown
+            if failed: self.update_status(f"Idle ({failed} job(s) failed, see Jobs panel)", error=True)
+            else: self.update_status("Idle")
+            self.update_progress(1.0 if self.job_rows else 0.0)
+            return
+        running = sum(1 for job in active_jobs if job.status == "running")
+        self.update_status(f"{running} running, {len(active_jobs) - running} queued ({self.engine.max_workers} slots)")
+        self.update_progress(sum(job.progress for job in active_jobs) / len(active_jobs))
+
+    # --- Thread-Safe UI Update Methods ---
+    def queue_ui_update(self, func, *args): self.batcher.queue_call(func, *args)
+    def observe_ui_latency(self, seconds):
+        if self.engine.metrics: self.engine.metrics.observe_ui_latency(seconds)
+    def process_ui_queue(self):
+        try: self.batcher.tick(self) # Calls update_job_row / refresh_overall_status / draw_lines below
+        except Exception as e: print(f"[UI Error] Failed flushing UI batches: {e}")
+        finally: self.after(100, self.process_ui_queue)
+    def draw_job(self, job): self.update_job_row(job)
+    def draw_overall(self): self.refresh_overall_status()
+    def draw_lines(self, lines, replace, trim):
+        """Inserts a tick's log lines in one call and trims the textbox to the configured line cap."""
+        self.output_text.configure(state="normal")
+        if replace: self.output_text.delete("1.0", tk.END)
+        self.output_text.insert(tk.END, "\n".join(lines) + "\n")
+        if trim: self.output_text.delete("1.0", f"{trim + 1}.0")
+        self.output_text.see(tk.END)
+        self.output_text.configure(state="disabled")
+    def update_status(self, message, error=False): color = "red" if error else "white"; self.progress_label.configure(text=f"Status: {message}", text_color=color)
+    def update_progress(self, value): clamped_value = max(0.0, min(1.0, value)); self.progress_bar.set(clamped_value)
+    def append_output(self, text): self.log.append(text) # Drawn on the next UI tick
+
+def run_gui():
+    """Creates the main window and runs the Tk event loop."""
+    ctk.set_appearance_mode("System")
+    ctk.set_default_color_theme("blue")
+
+    app = App()
+    app.mainloop()
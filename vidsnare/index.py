@@ -0,0 +1,139 @@
+import os
+import re
+import time
+import sqlite3
+import threading
+
+# Files saved with the default templates end in "[<video id>].<ext>"
+ID_IN_FILENAME_RE = re.compile(r'\[([A-Za-z0-9_-]+)\]\.([A-Za-z0-9]+)$')
+MP3_EXTENSION = "mp3" # audio_mp3 jobs always end as .mp3; other audio (e.g. a source not yet converted) is best_video_audio
+PARTIAL_SUFFIXES = (".part", ".ytdl", ".temp")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS downloads (
+    extractor TEXT NOT NULL,      -- yt-dlp extractor key, '' if unknown (rebuilt from a file name)
+    video_id TEXT NOT NULL,
+    format_option TEXT NOT NULL,  -- best_video_audio / audio_mp3
+    output_path TEXT NOT NULL,
+    size INTEGER,
+    completed_at REAL NOT NULL,
+    PRIMARY KEY (extractor, video_id, format_option)
+);
+CREATE INDEX IF NOT EXISTS downloads_by_id ON downloads (video_id, format_option);
+"""
+
+
+def archive_id(extractor, video_id):
+    """Returns the line yt-dlp uses for a video in a --download-archive file."""
+    return f"{extractor.lower()} {video_id}"
+
+
+# --- Download Index ---
+class DownloadIndex:
+    """SQLite record of completed downloads, shared by all jobs (one connection, serialized by a lock)."""
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.scanned_dirs = set() # Output folders already checked this session
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.db:
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.executescript(SCHEMA)
+
+    def is_completed(self, extractor, video_id, format_option):
+        """Returns True if the video was already saved with this format option.
+
+        Entries rebuilt from file names have no extractor and match on the video id alone.
+        """
+        with self.lock:
+            row = self.db.execute(
+                "SELECT 1 FROM downloads WHERE video_id = ? AND format_option = ? AND extractor IN (?, '') LIMIT 1",
+                (video_id, format_option, extractor or "")).fetchone()
+        return row is not None
+
+    def record(self, extractor, video_id, format_option, output_path):
+        """Marks a video as completed, replacing any older entry for the same key."""
+        try:
+            size = os.path.getsize(output_path)
+        except OSError:
+            size = None
+        with self.lock, self.db:
+            if extractor: # A real extractor key supersedes an entry rebuilt from the file name
+                self.db.execute("DELETE FROM downloads WHERE extractor = '' AND video_id = ? AND format_option = ?",
+                                (video_id, format_option))
+            self.db.execute(
+                "INSERT OR REPLACE INTO downloads (extractor, video_id, format_option, output_path, size, completed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (extractor or "", video_id, format_option, output_path, size, time.time()))
+
+    def write_archive(self, format_option, path):
+        """Writes the completed videos for a format option as a yt-dlp download archive. Returns the entry count."""
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT extractor, video_id FROM downloads WHERE format_option = ? AND extractor != ''",
+                (format_option,)).fetchall()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.writelines(archive_id(extractor, video_id) + "\n" for extractor, video_id in rows)
+        return len(rows)
+
+    def count(self):
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM downloads").fetchone()[0]
+
+    # --- Rebuilding ---
+    def rebuild(self, output_dir):
+        """Syncs the index with an output folder. Returns (added, removed).
+
+        Entries whose file is gone are dropped; saved files not yet indexed are added from their names.
+        """
+        output_dir = os.path.abspath(output_dir)
+        found = {}
+        for root, _dirs, files in os.walk(output_dir):
+            for name in files:
+                if name.endswith(PARTIAL_SUFFIXES):
+                    continue
+                match = ID_IN_FILENAME_RE.search(name)
+                if match:
+                    video_id, ext = match.groups()
+                    format_option = "audio_mp3" if ext.lower() == MP3_EXTENSION else "best_video_audio"
+                    found[(video_id, format_option)] = os.path.join(root, name)
+
+        added = removed = 0
+        prefix = os.path.join(output_dir, "")
+        with self.lock, self.db:
+            rows = self.db.execute(
+                "SELECT extractor, video_id, format_option, output_path FROM downloads WHERE substr(output_path, 1, ?) = ?",
+                (len(prefix), prefix)).fetchall()
+            known = set()
+            for extractor, video_id, format_option, output_path in rows:
+                if os.path.exists(output_path):
+                    known.add((video_id, format_option))
+                else:
+                    self.db.execute("DELETE FROM downloads WHERE extractor = ? AND video_id = ? AND format_option = ?",
+                                    (extractor, video_id, format_option))
+                    removed += 1
+            for (video_id, format_option), output_path in found.items():
+                if (video_id, format_option) in known:
+                    continue
+                try:
+                    size = os.path.getsize(output_path)
+                    completed_at = os.path.getmtime(output_path)
+                except OSError:
+                    continue
+                self.db.execute(
+                    "INSERT OR IGNORE INTO downloads (extractor, video_id, format_option, output_path, size, completed_at) "
+                    "VALUES ('', ?, ?, ?, ?, ?)",
+                    (video_id, format_option, output_path, size, completed_at))
+                added += 1
+        self.scanned_dirs.add(output_dir)
+        return added, removed
+
+    def ensure_scanned(self, output_dir):
+        """Rebuilds from an output folder once per session. Returns (added, removed), or None if already done."""
+        if os.path.abspath(output_dir) in self.scanned_dirs:
+            return None
+        return self.rebuild(output_dir)
+
+    def close(self):
+        with self.lock:
+            self.db.close()
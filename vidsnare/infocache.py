@@ -0,0 +1,144 @@
+import os
+import json
+import time
+import hashlib
+import threading
+import collections
+
+from .urls import normalize_url
+
+# Entry kinds: "flat" holds a flat playlist walk, "info" a single video's full info JSON
+# as written by --write-info-json and read back with --load-info-json.
+INFO_SUFFIX = ".info.json"
+FLAT_SUFFIX = ".flat.json"
+
+
+# --- Info Cache ---
+class InfoCache:
+    """On-disk cache of yt-dlp extraction results, keyed by normalized URL.
+
+    Entries older than `ttl` seconds are ignored and deleted (media URLs inside info JSON expire).
+    The cache is kept under `max_bytes` by evicting the least recently used entries.
+    """
+    def __init__(self, directory, ttl=3600, max_bytes=64 * 1024 * 1024):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+        self.entries = collections.OrderedDict() # path -> size, least recently used first
+        self.total_bytes = 0
+        found = []
+        for entry in os.scandir(directory):
+            if entry.is_file() and entry.name.endswith((INFO_SUFFIX, FLAT_SUFFIX)):
+                stat = entry.stat()
+                found.append((stat.st_mtime, entry.path, stat.st_size))
+        for _mtime, path, size in sorted(found): # Last session's use order is lost; write time approximates it
+            self.entries[path] = size
+            self.total_bytes += size
+
+    def _base_path(self, url):
+        return os.path.join(self.directory, hashlib.sha1((normalize_url(url) or url.strip()).encode('utf-8')).hexdigest())
+
+    def info_template(self, url):
+        """Returns the output template that makes yt-dlp write a URL's info JSON into the cache (infojson: type)."""
+        return self._base_path(url) + ".%(ext)s"
+
+    def _lookup(self, path):
+        """Returns the path if it is fresh, counting a hit or a miss. Caller holds the lock."""
+        if path in self.entries:
+            try:
+                fresh = time.time() - os.path.getmtime(path) < self.ttl
+            except OSError:
+                fresh = False
+            if fresh:
+                self.entries.move_to_end(path)
+                self.hits += 1
+                return path
+            self._remove(path)
+        self.misses += 1
+        return None
+
+    def lookup_info(self, url):
+        """Returns the cached info JSON file for a video URL, or None."""
+        with self.lock:
+            return self._lookup(self._base_path(url) + INFO_SUFFIX)
+
+    def load_flat(self, url):
+        """Returns the cached flat playlist for a URL, or None."""
+        with self.lock:
+            path = self._lookup(self._base_path(url) + FLAT_SUFFIX)
+        if not path:
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            self.invalidate(url)
+            return None
+
+    def store_flat(self, url, info):
+        """Caches a flat playlist walk."""
+        return self._store(self._base_path(url) + FLAT_SUFFIX, info)
+
+    def store_info(self, url, info):
+        """Caches a video's sanitized info dict. Returns the file to load it from, or None if it could not be written."""
+        return self._store(self._base_path(url) + INFO_SUFFIX, info)
+
+    def _store(self, path, info):
+        temp_path = path + ".tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(info, f)
+            os.replace(temp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"[Error] Could not write info cache entry '{path}': {e}")
+            return None
+        self.register(path)
+        return path
+
+    def register(self, path):
+        """Registers a file written into the cache directory and evicts old entries if needed."""
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        with self.lock:
+            self.total_bytes += size - self.entries.pop(path, 0)
+            self.entries[path] = size
+            while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+                self._remove(next(iter(self.entries)))
+
+    def info_written(self, url):
+        """Registers the info JSON yt-dlp wrote for a URL, if it wrote one."""
+        path = self._base_path(url) + INFO_SUFFIX
+        if os.path.exists(path):
+            self.register(path)
+
+    def _remove(self, path):
+        """Drops an entry and its file. Caller holds the lock."""
+        self.total_bytes -= self.entries.pop(path, 0)
+        try: os.remove(path)
+        except OSError: pass
+
+    def invalidate(self, url):
+        """Forgets everything cached for a URL."""
+        base = self._base_path(url)
+        with self.lock:
+            for path in (base + INFO_SUFFIX, base + FLAT_SUFFIX):
+                self._remove(path)
+
+    def clear(self):
+        """Empties the cache. Returns the number of entries removed."""
+        with self.lock:
+            count = len(self.entries)
+            for path in list(self.entries):
+                self._remove(path)
+            return count
+
+    def stats(self):
+        """Returns a short hit/miss summary for the log."""
+        with self.lock:
+            return f"{self.hits} hit(s), {self.misses} miss(es), {len(self.entries)} entr{'y' if len(self.entries) == 1 else 'ies'}"
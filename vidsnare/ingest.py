@@ -0,0 +1,275 @@
+import os
+import json
+import time
+import socket
+import threading
+import socketserver
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .urls import parse_url_lines
+
+DROP_POLL_INTERVAL = 2.0 # Seconds between drop folder scans
+DROP_RETRY_INTERVAL = 30.0 # Seconds before an unchanged list that failed is tried again
+PROCESSED_DIR = "processed" # Lists are moved here once queued, so they are read only once
+MAX_SUBMIT_BYTES = 1024 * 1024 # Largest request body the submit endpoint accepts
+LOCAL_HOST_NAMES = ("127.0.0.1", "localhost") # Host headers accepted on the TCP endpoint
+
+
+# --- Ingest Result ---
+class IngestResult:
+    """Outcome of DownloadEngine.ingest(): the jobs queued and the URLs left out."""
+    def __init__(self):
+        self.jobs = []
+        self.duplicates = [] # (url, reason)
+        self.invalid = [] # Text that is not a URL
+
+    def summary(self):
+        parts = [f"{len(self.jobs)} queued"]
+        if self.duplicates: parts.append(f"{len(self.duplicates)} duplicate(s) skipped")
+        if self.invalid: parts.append(f"{len(self.invalid)} invalid")
+        return ", ".join(parts)
+
+    def to_json(self):
+        return {"queued": [{"job_id": job.job_id, "url": job.url} for job in self.jobs],
+                "duplicates": [{"url": url, "reason": reason} for url, reason in self.duplicates],
+                "invalid": self.invalid}
+
+
+def ingest_options(options, defaults):
+    """Returns the DownloadEngine.ingest() keyword arguments for a submit request's options over a frontend's defaults.
+
+    Raises ValueError if the output folder cannot be created.
+    """
+    options = options or {}
+    kwargs = dict(defaults)
+    if options.get("output_dir"): kwargs["output_dir"] = os.path.expanduser(str(options["output_dir"]))
+    if options.get("format"): kwargs["format_option"] = options["format"]
+    if "playlist" in options: kwargs["download_playlist"] = bool(options["playlist"])
+    if "number_items" in options: kwargs["number_items"] = bool(options["number_items"])
+    try:
+        os.makedirs(kwargs["output_dir"], exist_ok=True)
+    except OSError as e:
+        raise ValueError(f"invalid output directory: {e}")
+    return kwargs
+
+
+def describe_result(result, source):
+    """Returns log lines for an IngestResult: skipped URLs, then a summary."""
+    lines = [f"[Info] Skipped duplicate {url} ({reason})" for url, reason in result.duplicates]
+    lines += [f"[Warning] Not a URL, skipped: {text}" for text in result.invalid]
+    lines.append(f"[Info] {source}: {result.summary()}.")
+    return lines
+
+
+# --- Drop Folder ---
+class DropFolderWatcher:
+    """Polls a folder for .txt URL lists and hands their URLs to submit(urls, source).
+
+    A file is read once its size and mtime stayed the same for one poll (so half-written
+    lists are not picked up), and moved into the processed/ subfolder once its URLs were queued.
+    A list that cannot be read or queued stays in place and is retried when it changes, or after
+    DROP_RETRY_INTERVAL seconds (e.g. once the output folder setting was fixed).
+    """
+    def __init__(self, folder, submit, poll_interval=DROP_POLL_INTERVAL):
+        self.folder = folder
+        self.submit = submit
+        self.poll_interval = poll_interval
+        self.processed_dir = os.path.join(folder, PROCESSED_DIR)
+        os.makedirs(self.processed_dir, exist_ok=True)
+        self.seen = {} # path -> (size, mtime) at the last scan
+        self.failed = {} # path -> ((size, mtime), retry_at) of a list that could not be read or queued
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while not self.stop_event.wait(self.poll_interval):
+            try:
+                self.scan()
+            except OSError as e:
+                print(f"[Error] Could not scan drop folder '{self.folder}': {e}")
+            except Exception as e: # Keep watching; one bad list must not stop the folder
+                print(f"[Error] Drop folder '{self.folder}' scan failed: {e}")
+
+    def scan(self):
+        """Queues every list that has stopped changing since the last scan."""
+        current = {}
+        for entry in os.scandir(self.folder):
+            if entry.is_file() and entry.name.lower().endswith(".txt"):
+                stat = entry.stat()
+                current[entry.path] = (stat.st_size, stat.st_mtime)
+        for path, state in sorted(current.items()):
+            if self.seen.get(path) == state and not self._backing_off(path, state):
+                self._process(path, state)
+        self.seen = current
+
+    def _backing_off(self, path, state):
+        failed_state, retry_at = self.failed.get(path, (None, 0))
+        return failed_state == state and time.monotonic() < retry_at
+
+    def _failed(self, path, state):
+        self.failed[path] = (state, time.monotonic() + DROP_RETRY_INTERVAL)
+
+    def _process(self, path, state):
+        try:
+            with open(path, 'r', encoding='utf-8-sig') as f: # Lists saved by Notepad start with a BOM
+                urls = parse_url_lines(f)
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"[Error] Could not read URL list '{path}': {e}")
+            self._failed(path, state)
+            return
+        name = os.path.basename(path)
+        try:
+            self.submit(urls, f"drop folder ({name})")
+        except Exception as e: # ValueError for bad options (e.g. an output folder that cannot be created)
+            print(f"[Error] Could not queue URL list '{path}': {e}")
+            self._failed(path, state)
+            return
+        self.failed.pop(path, None)
+        target = os.path.join(self.processed_dir, name)
+        if os.path.exists(target): # Same list dropped again
+            stem, ext = os.path.splitext(name)
+            target = os.path.join(self.processed_dir, f"{stem}.{time.strftime('%Y%m%d-%H%M%S')}{ext}")
+        try:
+            os.replace(path, target)
+        except OSError as e: # Its URLs are queued; leaving it would only queue duplicates
+            print(f"[Error] Could not move '{path}' to '{self.processed_dir}': {e}")
+            self._failed(path, state)
+
+    def close(self):
+        self.stop_event.set()
+        self.thread.join()
+
+
+# --- Submit Endpoint ---
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class SubmitServer:
+    """Local HTTP endpoint other tools POST URLs to, on 127.0.0.1:<port> and/or a Unix socket.
+
+    POST /submit takes a text body (one URL per line) or JSON {"urls": [...], "output_dir": ...,
+    "format": ..., "playlist": ..., "number_items": ...}; submit(urls, source, options) queues them
+    and returns an IngestResult, sent back as JSON. GET /jobs lists the queued and running jobs.
+    With a token, requests need an "Authorization: Bearer <token>" header. Requests from browsers
+    (with an Origin header) and, over TCP, for a Host other than 127.0.0.1/localhost are refused.
+    """
+    def __init__(self, engine, submit, port=0, socket_path=None, token=None):
+        class Handler(BaseHTTPRequestHandler):
+            def send_json(self, status, payload):
+                body = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def authorized(self):
+                # A web page open in a local browser can POST here without a CORS preflight; browsers
+                # always send Origin on such requests, other tools don't. The Host check stops DNS rebinding.
+                if self.headers.get("Origin") is not None:
+                    self.send_json(403, {"error": "browser requests are not accepted"})
+                    return False
+                if not isinstance(self.server, ThreadingUnixHTTPServer):
+                    host = (self.headers.get("Host") or "").rsplit(":", 1)[0]
+                    if host not in LOCAL_HOST_NAMES:
+                        self.send_json(403, {"error": f"unexpected Host {host!r}"})
+                        return False
+                if token and self.headers.get("Authorization") != f"Bearer {token}":
+                    self.send_json(401, {"error": "missing or wrong token"})
+                    return False
+                return True
+
+            def do_GET(self):
+                if self.path.split("?")[0] != "/jobs":
+                    self.send_json(404, {"error": "not found"})
+                    return
+                if not self.authorized(): return
+                self.send_json(200, {"jobs": [{"job_id": job.job_id, "url": job.url, "status": job.status,
+                                               "status_text": job.status_text, "progress": round(job.progress, 3)}
+                                              for job in engine.active_jobs() if not job.parent]})
+
+            def do_POST(self):
+                if self.path.split("?")[0] != "/submit":
+                    self.send_json(404, {"error": "not found"})
+                    return
+                if not self.authorized(): return
+                try:
+                    length = int(self.headers.get("Content-Length") or 0)
+                except ValueError:
+                    self.send_json(400, {"error": "invalid Content-Length"})
+                    return
+                if length > MAX_SUBMIT_BYTES:
+                    self.send_json(413, {"error": f"body larger than {MAX_SUBMIT_BYTES} bytes"})
+                    return
+                body = self.rfile.read(length).decode('utf-8', errors='replace')
+                options = {}
+                if self.headers.get("Content-Type", "").startswith("application/json"):
+                    try:
+                        payload = json.loads(body)
+                        urls = payload.get("urls") or ([payload["url"]] if payload.get("url") else [])
+                        if isinstance(urls, str): urls = [urls]
+                        urls = [str(url) for url in urls]
+                    except (ValueError, AttributeError, TypeError) as e:
+                        self.send_json(400, {"error": f"invalid JSON: {e}"})
+                        return
+                    options = {key: payload[key] for key in ("output_dir", "format", "playlist", "number_items") if key in payload}
+                else:
+                    urls = parse_url_lines(body.splitlines())
+                if not urls:
+                    self.send_json(400, {"error": "no URLs given"})
+                    return
+                try:
+                    result = submit(urls, "submit endpoint", options)
+                except ValueError as e: # Bad options, e.g. an unknown format
+                    self.send_json(400, {"error": str(e)})
+                    return
+                self.send_json(200, result.to_json())
+
+            def log_message(self, *args): # Keep requests out of the console
+                pass
+
+        self.servers = []
+        self.port = None
+        self.socket_path = None
+        if port:
+            server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+            server.daemon_threads = True
+            self.servers.append(server)
+            self.port = server.server_address[1]
+        if socket_path and hasattr(socket, "AF_UNIX"):
+            remove_stale_socket(socket_path)
+            server = ThreadingUnixHTTPServer(socket_path, Handler)
+            os.chmod(socket_path, 0o600) # Only the owner may queue downloads through the socket
+            self.servers.append(server)
+            self.socket_path = socket_path
+        elif socket_path:
+            print("[Warning] Unix sockets are not available on this system; submit_socket is ignored.")
+        for server in self.servers:
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def close(self):
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+        if self.socket_path:
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+
+
+def remove_stale_socket(path):
+    """Deletes a socket file left by a previous run. Raises OSError if another process still listens on it."""
+    if not os.path.exists(path):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except OSError:
+        os.unlink(path) # Nobody listening
+    else:
+        raise OSError(f"another process is already listening on '{path}'")
+    finally:
+        probe.close()
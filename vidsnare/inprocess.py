@@ -0,0 +1,207 @@
+import os
+import threading
+
+from .config import output_template_for
+from .progress import ProgressEvent
+
+# --- Optional Dependency ---
+try:
+    import yt_dlp
+    from yt_dlp.utils import DownloadCancelled
+except ImportError: # The subprocess backend only needs the yt-dlp executable
+    yt_dlp = None
+    DownloadCancelled = None
+
+
+def inprocess_available():
+    """Returns True if the yt_dlp package can be imported."""
+    return yt_dlp is not None
+
+
+def output_template(job):
+    """Returns the YoutubeDL outtmpl for a job: its own template (numbered playlist items) or the default one."""
+    return {'default': os.path.join(job.output_dir, job.output_template or output_template_for(job.download_playlist, job.number_items))}
+
+
+def build_ydl_options(job, ffmpeg_available=True, extract_audio=True):
+    """Returns YoutubeDL params equivalent to the command line built by engine.build_command."""
+    options = {
+        'outtmpl': output_template(job),
+        'noplaylist': not job.download_playlist,
+        'continuedl': True, # Resume .part files left by an interrupted run
+        'ignoreerrors': True,
+        'noprogress': True, # Progress arrives through progress_hooks
+    }
+    # --- Add Format Options ---
+    if job.format_option == "best_video_audio":
+        options['format'] = 'bv*+ba/b'
+    elif job.format_option == "audio_mp3":
+        if not ffmpeg_available:
+            raise RuntimeError("Audio extraction selected, but ffmpeg is not available.")
+        options['format'] = 'ba'
+        if extract_audio: # Otherwise the engine's transcode pool converts the file
+            options['postprocessors'] = [{'key': 'FFmpegExtractAudio', 'preferredcodec': 'mp3'}]
+    return options
+
+
+def _options_key(job):
+    """Jobs with the same key can share a YoutubeDL instance; the output template is set per job in attach()."""
+    return (job.format_option, bool(job.download_playlist))
+
+
+def _playlist_fields(info):
+    info = info or {}
+    return info.get('playlist_index'), info.get('n_entries'), info.get('id')
+
+
+# --- Job Logger ---
+class JobLogger:
+    """YoutubeDL logger that forwards messages to the engine log of the attached job and counts errors."""
+    def __init__(self, engine, job=None):
+        self.engine = engine
+        self.job = job
+        self.error_count = 0
+
+    def debug(self, message):
+        if not message.startswith('[debug] '):
+            self.engine.log(self.job, message)
+
+    def info(self, message):
+        self.engine.log(self.job, message)
+
+    def warning(self, message):
+        self.engine.log(self.job, f"WARNING: {message}")
+
+    def error(self, message):
+        self.error_count += 1
+        self.engine.log(self.job, message)
+
+
+# --- Pooled YoutubeDL ---
+class PooledDownloader:
+    """A warm YoutubeDL instance plus the job it is currently serving.
+
+    The instance's logger and hooks are bound once; they forward to whichever job is attached.
+    """
+    def __init__(self, backend, options):
+        self.backend = backend
+        self.job = None
+        self.logger = JobLogger(backend.engine)
+        options = dict(options, logger=self.logger, progress_hooks=[self.progress_hook],
+                       postprocessor_hooks=[self.postprocessor_hook], match_filter=self.match_filter)
+        self.ydl = yt_dlp.YoutubeDL(options)
+
+    def attach(self, job):
+        """Points the logger and hooks at a job (None to detach)."""
+        self.job = job
+        self.logger.job = job
+        self.logger.error_count = 0
+        if job: self.ydl.params['outtmpl'].update(output_template(job)) # Numbered playlist items each have their own
+        self.ydl.params['ratelimit'] = job.rate_limit if job else None
+        self.ydl.params['concurrent_fragment_downloads'] = (job.concurrent_fragments if job else None) or 1
+
+    # --- Hooks ---
+    def match_filter(self, info, *, incomplete=False):
+        """Skips videos the download index already has, before they are fully extracted."""
+        index = self.backend.engine.index
+        video_id = info.get('id')
+        if index and video_id:
+            extractor = info.get('extractor_key') or info.get('ie_key')
+            if index.is_completed(extractor, video_id, self.job.format_option):
+                return f"{video_id} is already in the VidSnare download index"
+        return None
+
+    def check_cancelled(self):
+        if self.job.cancel_requested.is_set():
+            raise DownloadCancelled("Cancelled by user")
+
+    def progress_hook(self, d):
+        self.check_cancelled()
+        # yt-dlp's downloader reads ratelimit from these params on every block, so a rebalanced share applies at once
+        self.ydl.params['ratelimit'] = self.job.rate_limit
+        index, count, video_id = _playlist_fields(d.get('info_dict'))
+        event = ProgressEvent(
+            "download", d.get('status'),
+            downloaded_bytes=d.get('downloaded_bytes'),
+            total_bytes=d.get('total_bytes') or d.get('total_bytes_estimate'),
+            speed=d.get('speed'), eta=d.get('eta'), fragment_count=d.get('fragment_count'),
+            playlist_index=index, playlist_count=count, video_id=video_id,
+        )
+        self.backend.engine.report_progress(self.job, event)
+
+    def postprocessor_hook(self, d):
+        self.check_cancelled()
+        index, count, video_id = _playlist_fields(d.get('info_dict'))
+        event = ProgressEvent("postprocess", d.get('status'), playlist_index=index, playlist_count=count,
+                              video_id=video_id, postprocessor=d.get('postprocessor'))
+        self.backend.engine.report_progress(self.job, event)
+        if d.get('postprocessor') == 'MoveFiles' and d.get('status') == 'finished':
+            info = d.get('info_dict') or {} # Files are at their final path once MoveFiles is done
+            self.backend.engine.report_progress(self.job, ProgressEvent(
+                "done", "finished", playlist_index=index, playlist_count=count, video_id=video_id,
+                extractor=info.get('extractor_key'), filepath=info.get('filepath')))
+
+
+# --- In-Process Backend ---
+class InProcessBackend:
+    """Runs jobs through the yt_dlp package, reusing idle YoutubeDL instances between jobs."""
+    def __init__(self, engine):
+        self.engine = engine
+        self.lock = threading.Lock()
+        self.idle = {} # options key -> [PooledDownloader, ...]
+
+    def acquire(self, job):
+        """Returns an idle instance for the job's options, creating one if needed."""
+        key = _options_key(job)
+        with self.lock:
+            instances = self.idle.get(key)
+            if instances:
+                return instances.pop()
+        options = build_ydl_options(job, self.engine.ffmpeg_available, extract_audio=not self.engine.is_pipelined(job))
+        return PooledDownloader(self, options)
+
+    def release(self, job, downloader):
+        """Detaches the job and keeps the instance warm, up to one per worker slot."""
+        downloader.attach(None)
+        key = _options_key(job)
+        with self.lock:
+            instances = self.idle.setdefault(key, [])
+            if len(instances) < self.engine.max_workers:
+                instances.append(downloader)
+
+    def resolve_playlist(self, job):
+        """Flat-extracts a URL in this process. Returns the info dict, or None on failure."""
+        options = {'extract_flat': 'in_playlist', 'noplaylist': False, 'logger': JobLogger(self.engine, job), 'no_warnings': True}
+        try:
+            with yt_dlp.YoutubeDL(options) as ydl:
+                return ydl.sanitize_info(ydl.extract_info(job.url, download=False))
+        except Exception as e: # DownloadError and extractor errors; the single-job path reports them again
+            self.engine.log(job, f"[Playlist] Could not resolve playlist: {e}")
+            return None
+
+    def run(self, job):
+        """Downloads a job in this process. Returns 0 on success, 1 if yt-dlp reported errors."""
+        downloader = self.acquire(job)
+        downloader.attach(job)
+        job.metrics.mark("spawned")
+        self.engine.log(job, f"Running in-process: yt_dlp {yt_dlp.version.__version__}")
+        info_cache = self.engine.info_cache if not job.download_playlist else None
+        try:
+            if job.info_file:
+                downloader.ydl.download_with_info_file(job.info_file)
+            elif info_cache:
+                # Extract first so the info can be cached, then download from the cached file
+                info = downloader.ydl.extract_info(job.url, download=False)
+                info_file = info_cache.store_info(job.url, downloader.ydl.sanitize_info(info)) if info else None
+                if info_file:
+                    downloader.ydl.download_with_info_file(info_file)
+                elif info: # Could not write the cache entry
+                    downloader.ydl.download([job.url])
+            else:
+                downloader.ydl.download([job.url])
+            # YoutubeDL's own return code is sticky across downloads, so count errors per job instead
+            return 1 if downloader.logger.error_count else 0
+        except DownloadCancelled:
+            return None
+        finally:
+            self.release(job, downloader)
@@ -0,0 +1,97 @@
+import os
+import json
+import time
+import threading
+
+# Events written per job, in order: submitted, running, then one of finished/failed/cancelled.
+# A job whose last event is submitted or running was interrupted and is resumed on the next start.
+TERMINAL_EVENTS = ("finished", "failed", "cancelled")
+JOB_FIELDS = ("url", "output_dir", "format_option", "download_playlist", "number_items")
+
+
+# --- Job Journal ---
+class JobJournal:
+    """Append-only JSON-lines log of job state, used to resume interrupted jobs after a restart."""
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.batches = 0 # Open begin_batch() calls; records are synced once by the last end_batch()
+        self.interrupted = self._load()
+        self._compact()
+        self.file = open(path, 'a', encoding='utf-8')
+
+    def _load(self):
+        """Replays the journal and returns the submitted records of unfinished jobs, oldest first."""
+        jobs = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue # Torn last line after a crash
+                    key = record.get("key")
+                    event = record.get("event")
+                    if event == "submitted":
+                        jobs[key] = record
+                    elif event in TERMINAL_EVENTS:
+                        jobs.pop(key, None)
+        except FileNotFoundError:
+            pass
+        return list(jobs.values())
+
+    def _compact(self):
+        """Rewrites the journal with only the unfinished jobs so it does not grow forever."""
+        temp_path = self.path + ".tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                for record in self.interrupted:
+                    f.write(json.dumps(record) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"[Error] Could not compact job journal '{self.path}': {e}")
+
+    def _append(self, record):
+        record["time"] = time.time()
+        with self.lock:
+            if not self.file:
+                return
+            self.file.write(json.dumps(record) + "\n")
+            if not self.batches:
+                self._sync() # One sync per job state change, so a crash loses nothing
+
+    def _sync(self):
+        """Flushes and syncs the journal file. Caller holds the lock."""
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def begin_batch(self):
+        """Defers syncing until end_batch(), so queueing thousands of URLs costs one fsync instead of one each."""
+        with self.lock:
+            self.batches += 1
+
+    def end_batch(self):
+        with self.lock:
+            self.batches -= 1
+            if not self.batches and self.file:
+                self._sync()
+
+    def submitted(self, job):
+        record = {"event": "submitted", "key": job.journal_key}
+        record.update((field, getattr(job, field)) for field in JOB_FIELDS)
+        self._append(record)
+
+    def running(self, job):
+        self._append({"event": "running", "key": job.journal_key})
+
+    def ended(self, job):
+        """Records a job's terminal status (finished, failed or cancelled)."""
+        self._append({"event": job.status, "key": job.journal_key})
+
+    def close(self):
+        with self.lock:
+            if self.file:
+                self.file.close()
+                self.file = None
@@ -0,0 +1,109 @@
+import re
+import threading
+from urllib.parse import urlparse
+
+MIN_JOB_RATE = 10 * 1024 # Bytes/sec; a job's share never drops below this
+RATE_RE = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([KMG]?)i?B?\s*$', re.IGNORECASE)
+RATE_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+
+
+def parse_rate(value):
+    """Parses a rate like 500000, "500K" or "2.5M" (bytes/sec, binary units like yt-dlp's -r). Returns None if invalid."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value) if value >= 0 else None
+    match = RATE_RE.match(str(value))
+    if not match:
+        return None
+    number, unit = match.groups()
+    return int(float(number) * RATE_UNITS[unit.upper()])
+
+
+def host_key(url):
+    """Returns the host a URL counts against for per-host limits ("www." stripped, lowercase)."""
+    host = (urlparse(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+# --- Per-Host Limits ---
+class HostLimits:
+    """Caps how many jobs may run against one host at the same time (0 = unlimited)."""
+    def __init__(self, default_limit=0, overrides=None):
+        self.default_limit = default_limit
+        self.overrides = {host_key("//" + host): limit for host, limit in (overrides or {}).items()}
+
+    def limit_for(self, host):
+        """Returns the cap for a host; an entry for example.com also covers its subdomains."""
+        parts = host.split(".")
+        for i in range(len(parts) - 1):
+            limit = self.overrides.get(".".join(parts[i:]))
+            if limit is not None:
+                return limit
+        return self.default_limit
+
+    def allows(self, host, running_count):
+        limit = self.limit_for(host)
+        return not limit or running_count < limit
+
+
+# --- Bandwidth Budget ---
+class BandwidthBudget:
+    """Splits a total download rate across the jobs that are downloading, without going over it.
+
+    Each job's share is kept in job.rate_limit. A yt-dlp process keeps the -r value it started
+    with, so its share is fixed at the total divided by the worker slots: every slot can start a
+    download at once, and later jobs never wait for a share the first one holds. A job only waits
+    while less than MIN_JOB_RATE is free (after the slot count was raised). In-process jobs pick up
+    a new share immediately, so they split what is left evenly and are rebalanced whenever a job
+    joins or leaves.
+    """
+    def __init__(self, total_rate):
+        self.total_rate = total_rate
+        self.lock = threading.Lock()
+        self.changed = threading.Condition(self.lock)
+        self.jobs = set() # Jobs with an adjustable share
+        self.fixed = {} # job -> share it was started with
+
+    def join(self, job, slots=1, fixed=False, cancelled=None, poll_interval=0.5):
+        """Adds a downloading job and returns its share in bytes/sec; slots is the number of worker slots.
+
+        A fixed job blocks until enough of the budget is free; returns None if cancelled() turns true meanwhile.
+        """
+        with self.lock:
+            if not fixed:
+                self.jobs.add(job)
+                self._rebalance()
+                return job.rate_limit
+            minimum = min(MIN_JOB_RATE, self.total_rate)
+            while self._free() < minimum:
+                if cancelled and cancelled():
+                    return None
+                self.changed.wait(poll_interval)
+            job.rate_limit = max(minimum, min(self.total_rate // max(1, slots), self._free()))
+            self.fixed[job] = job.rate_limit
+            self._rebalance()
+            return job.rate_limit
+
+    def leave(self, job):
+        """Removes a job and hands its share to the others. Safe to call for jobs that never joined."""
+        with self.lock:
+            if job not in self.jobs and job not in self.fixed:
+                return
+            self.jobs.discard(job)
+            self.fixed.pop(job, None)
+            job.rate_limit = None
+            self._rebalance()
+            self.changed.notify_all()
+
+    def _free(self):
+        """Returns the rate not held by fixed shares. Caller holds the lock."""
+        return self.total_rate - sum(self.fixed.values())
+
+    def _rebalance(self):
+        """Splits what the fixed shares leave free across the adjustable jobs. Caller holds the lock."""
+        if not self.jobs:
+            return
+        share = max(MIN_JOB_RATE, self._free() // len(self.jobs))
+        for job in self.jobs:
+            job.rate_limit = share
@@ -0,0 +1,59 @@
+import time
+import threading
+import collections
+
+from .config import DEFAULT_LOG_MAX_LINES
+
+
+# --- Log Buffer ---
+class LogBuffer:
+    """Thread-safe queue of log lines for the UI, with optional streaming of the full log to a file.
+
+    Writers call append() from any thread. The UI calls take_pending() once per tick and
+    gets every line added since the last call, already capped at max_lines. The output pane
+    itself holds the lines on screen; only lines the UI has not taken yet are kept here.
+    """
+    def __init__(self, max_lines=DEFAULT_LOG_MAX_LINES, log_file=None):
+        self.max_lines = max(1, int(max_lines))
+        self.lock = threading.Lock()
+        self.pending = collections.deque(maxlen=self.max_lines)
+        self.dropped = 0 # Pending lines that fell off the ring before the UI took them
+        self.pending_since = None # time.monotonic() when the oldest pending line arrived
+        self.file = None
+        if log_file:
+            try:
+                self.file = open(log_file, 'a', encoding='utf-8')
+            except OSError as e:
+                print(f"[Error] Could not open log file '{log_file}': {e}")
+
+    def append(self, text):
+        """Adds a line to the buffer (and the log file, if any)."""
+        with self.lock:
+            if len(self.pending) == self.max_lines:
+                self.dropped += 1
+            if self.pending_since is None:
+                self.pending_since = time.monotonic()
+            self.pending.append(text)
+            if self.file:
+                self.file.write(text + "\n")
+
+    def take_pending(self):
+        """Returns (lines, dropped) added since the last call and resets both."""
+        with self.lock:
+            if not self.pending and not self.dropped:
+                return [], 0
+            lines = list(self.pending)
+            dropped = self.dropped
+            self.pending.clear()
+            self.dropped = 0
+            self.pending_since = None
+            if self.file:
+                self.file.flush() # One flush per UI tick instead of one per line
+            return lines, dropped
+
+    def close(self):
+        """Flushes and closes the log file."""
+        with self.lock:
+            if self.file:
+                self.file.close()
+                self.file = None
@@ -0,0 +1,187 @@
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .progress import format_bytes
+
+# Phases reported per job, in order. Each is the time between two marks; postprocessors
+# (Merger, ExtractAudio, ...) are reported separately from the summed postprocess events.
+PHASES = (
+    ("queue_wait", "submitted", "started"),      # Waiting for a worker slot
+    ("spawn", "started", "spawned"),             # Starting yt-dlp (or taking a pooled YoutubeDL)
+    ("extraction", "spawned", "download_start"), # Until the first download progress
+    ("download", "download_start", "download_end"),
+    ("finalize", "download_end", "ended"),       # Post-processing, moving files and any mp3 conversion
+)
+
+
+# --- Job Metrics ---
+class JobMetrics:
+    """Timestamps and transfer figures collected while one job runs."""
+    def __init__(self):
+        self.marks = {} # name -> time.time() of its first occurrence
+        self.postprocess = {} # postprocessor -> seconds spent
+        self.postprocess_started = {}
+        self.bytes = 0 # Bytes of every finished download (video and audio of a merged format count separately)
+        self.peak_speed = 0.0
+
+    def mark(self, name):
+        """Records when something first happened."""
+        self.marks.setdefault(name, time.time())
+
+    def observe(self, event):
+        """Updates timings from a ProgressEvent."""
+        now = time.time()
+        if event.stage == "download":
+            self.marks.setdefault("download_start", now)
+            if event.speed and event.speed > self.peak_speed:
+                self.peak_speed = event.speed
+            if event.status == "finished":
+                self.bytes += event.downloaded_bytes or event.total_bytes or 0
+                self.marks["download_end"] = now # Last finished download
+        elif event.stage == "postprocess" and event.postprocessor:
+            if event.status == "started":
+                self.postprocess_started[event.postprocessor] = now
+            elif event.status == "finished" and event.postprocessor in self.postprocess_started:
+                elapsed = now - self.postprocess_started.pop(event.postprocessor)
+                self.postprocess[event.postprocessor] = self.postprocess.get(event.postprocessor, 0.0) + elapsed
+
+    def phases(self):
+        """Returns {phase: seconds} for the phases whose start and end marks exist."""
+        result = {}
+        for phase, start, end in PHASES:
+            if start in self.marks and end in self.marks:
+                result[phase] = max(0.0, self.marks[end] - self.marks[start])
+        return result
+
+    def average_speed(self):
+        download = self.phases().get("download")
+        return self.bytes / download if download else None
+
+
+# --- Metrics Recorder ---
+class MetricsRecorder:
+    """Writes one JSON line per finished job and keeps running totals for the Prometheus endpoint."""
+    def __init__(self, path=None):
+        self.lock = threading.Lock()
+        self.file = None
+        if path:
+            try:
+                self.file = open(path, 'a', encoding='utf-8')
+            except OSError as e:
+                print(f"[Error] Could not open metrics file '{path}': {e}")
+        self.jobs_by_status = {}
+        self.bytes_total = 0
+        self.phase_sums = {} # phase -> [seconds, count]
+        self.ui_latency = [0.0, 0, 0.0] # sum, count, max
+        self.gauges = {} # name -> (help, callable), read when the endpoint is scraped
+
+    def job_finished(self, job, backend):
+        """Records a job that reached its final status."""
+        metrics = job.metrics
+        phases = metrics.phases()
+        for postprocessor, seconds in metrics.postprocess.items():
+            phases["postprocess:" + postprocessor] = seconds
+        average = metrics.average_speed()
+        record = {
+            "time": time.time(), "job_id": job.job_id, "parent_job_id": job.parent.job_id if job.parent else None,
+            "url": job.url, "host": job.host, "format": job.format_option, "backend": backend,
+            "status": job.status, "return_code": job.return_code, "marks": metrics.marks,
+            "phases": {phase: round(seconds, 3) for phase, seconds in phases.items()},
+            "bytes": metrics.bytes, "average_speed": round(average) if average else None,
+            "peak_speed": round(metrics.peak_speed) or None,
+            "concurrent_fragments": job.concurrent_fragments, "info_cache_hit": job.info_file is not None,
+        }
+        with self.lock:
+            self.jobs_by_status[job.status] = self.jobs_by_status.get(job.status, 0) + 1
+            self.bytes_total += metrics.bytes
+            for phase, seconds in phases.items():
+                totals = self.phase_sums.setdefault(phase, [0.0, 0])
+                totals[0] += seconds; totals[1] += 1
+            if self.file:
+                self.file.write(json.dumps(record) + "\n")
+                self.file.flush()
+
+    def observe_ui_latency(self, seconds):
+        """Records how long a UI update (queued call, or oldest batched line/job change) waited for the Tk thread."""
+        with self.lock:
+            self.ui_latency[0] += seconds; self.ui_latency[1] += 1
+            self.ui_latency[2] = max(self.ui_latency[2], seconds)
+
+    def add_gauge(self, name, help_text, read):
+        self.gauges[name] = (help_text, read)
+
+    def prometheus_text(self):
+        """Returns the current totals in the Prometheus text exposition format."""
+        with self.lock:
+            lines = ["# HELP vidsnare_jobs_total Jobs that reached a final status.", "# TYPE vidsnare_jobs_total counter"]
+            lines += [f'vidsnare_jobs_total{{status="{status}"}} {count}' for status, count in sorted(self.jobs_by_status.items())]
+            lines += ["# HELP vidsnare_downloaded_bytes_total Bytes downloaded by finished downloads.",
+                      "# TYPE vidsnare_downloaded_bytes_total counter", f"vidsnare_downloaded_bytes_total {self.bytes_total}"]
+            lines += ["# HELP vidsnare_job_phase_seconds Time jobs spent per phase.", "# TYPE vidsnare_job_phase_seconds summary"]
+            for phase, (seconds, count) in sorted(self.phase_sums.items()):
+                lines.append(f'vidsnare_job_phase_seconds_sum{{phase="{phase}"}} {seconds:.6f}')
+                lines.append(f'vidsnare_job_phase_seconds_count{{phase="{phase}"}} {count}')
+            latency_sum, latency_count, latency_max = self.ui_latency
+            lines += ["# HELP vidsnare_ui_queue_latency_seconds Delay between queueing a UI update (call, log lines, job changes) and applying it.",
+                      "# TYPE vidsnare_ui_queue_latency_seconds summary",
+                      f"vidsnare_ui_queue_latency_seconds_sum {latency_sum:.6f}",
+                      f"vidsnare_ui_queue_latency_seconds_count {latency_count}",
+                      "# HELP vidsnare_ui_queue_latency_max_seconds Longest UI update delay seen.",
+                      "# TYPE vidsnare_ui_queue_latency_max_seconds gauge",
+                      f"vidsnare_ui_queue_latency_max_seconds {latency_max:.6f}"]
+        for name, (help_text, read) in sorted(self.gauges.items()):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {read()}"]
+        return "\n".join(lines) + "\n"
+
+    def close(self):
+        with self.lock:
+            if self.file:
+                self.file.close()
+                self.file = None
+
+
+# --- Prometheus Endpoint ---
+class MetricsServer:
+    """Serves MetricsRecorder.prometheus_text() at http://127.0.0.1:<port>/metrics on a background thread."""
+    def __init__(self, recorder, port, host="127.0.0.1"):
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = recorder.prometheus_text().encode('utf-8')
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args): # Keep scrapes out of the console
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    @property
+    def port(self):
+        return self.server.server_address[1]
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def describe_timings(metrics):
+    """Returns a one-line timing summary of a job for the log."""
+    parts = [f"{phase.replace('_', ' ')} {seconds:.1f}s" for phase, seconds in metrics.phases().items()]
+    parts += [f"{postprocessor} {seconds:.1f}s" for postprocessor, seconds in metrics.postprocess.items()]
+    average = metrics.average_speed()
+    if metrics.bytes:
+        speed = f" at {format_bytes(average)}/s avg" if average else ""
+        peak = f", {format_bytes(metrics.peak_speed)}/s peak" if metrics.peak_speed else ""
+        parts.append(f"{format_bytes(metrics.bytes)}{speed}{peak}")
+    return ", ".join(parts)
@@ -0,0 +1,109 @@
+import os
+import queue
+import threading
+import subprocess
+
+from .process import POLL_INTERVAL, TERMINATE_TIMEOUT, popen_options, stop_tree
+
+# Same quality yt-dlp uses for -x --audio-format mp3 (--audio-quality 5, VBR)
+MP3_ARGS = ['-vn', '-codec:a', 'libmp3lame', '-q:a', '5']
+
+
+def convert_to_mp3(source_path, ffmpeg_command="ffmpeg", is_cancelled=None):
+    """Converts a downloaded file to mp3 next to it and removes the source. Returns the mp3 path.
+
+    ffmpeg runs in its own process group; once is_cancelled() is true it is stopped, the partial
+    output removed and None returned.
+    """
+    base, ext = os.path.splitext(source_path)
+    if ext.lower() == ".mp3":
+        return source_path
+    output_path = base + ".mp3"
+    temp_path = base + ".temp.mp3" # Renamed into place only once ffmpeg succeeded
+    command = [ffmpeg_command, '-y', '-loglevel', 'error', '-i', source_path] + MP3_ARGS + [temp_path]
+    process = subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                               text=True, encoding='utf-8', errors='replace', **popen_options())
+    while True:
+        if is_cancelled and is_cancelled():
+            stop_tree(process)
+            output = None
+            break
+        try:
+            output, _ = process.communicate(timeout=POLL_INTERVAL)
+            break
+        except subprocess.TimeoutExpired:
+            continue
+    if output is None or process.returncode != 0:
+        try: os.remove(temp_path)
+        except OSError: pass
+        if output is None:
+            return None
+        raise RuntimeError(f"ffmpeg failed (Code: {process.returncode}): {output.strip()}")
+    os.replace(temp_path, output_path)
+    os.remove(source_path)
+    return output_path
+
+
+# --- Transcode Pool ---
+class TranscodePool:
+    """Bounded pool of ffmpeg workers that converts finished downloads while other downloads continue.
+
+    submit() blocks once `backlog` files are waiting, which stalls the downloading job until a
+    worker catches up, so unconverted files cannot pile up on disk.
+    """
+    def __init__(self, workers=0, backlog=0, ffmpeg_command="ffmpeg"):
+        self.workers = workers if workers and workers > 0 else (os.cpu_count() or 1)
+        self.backlog = backlog if backlog and backlog > 0 else self.workers * 2
+        self.ffmpeg_command = ffmpeg_command
+        self.tasks = queue.Queue(maxsize=self.backlog)
+        self.stopping = threading.Event() # Set by shutdown(); running and queued conversions are cancelled
+        self.threads = []
+        for _ in range(self.workers):
+            thread = threading.Thread(target=self._worker, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def submit(self, source_path, on_done, is_cancelled=None):
+        """Queues a conversion; on_done(output_path, error) is called on a pool thread.
+
+        is_cancelled() is checked before and during the conversion; cancelled tasks report error "Cancelled".
+        """
+        task = (source_path, on_done, is_cancelled)
+        while True:
+            try:
+                self.tasks.put(task, timeout=0.5) # Short waits so a cancelled job stops waiting for room
+                return
+            except queue.Full:
+                if is_cancelled and is_cancelled():
+                    on_done(None, "Cancelled")
+                    return
+
+    def _worker(self):
+        while True:
+            task = self.tasks.get()
+            if task is None:
+                return
+            source_path, on_done, is_cancelled = task
+            cancelled = lambda: self.stopping.is_set() or bool(is_cancelled and is_cancelled())
+            output_path = error = None
+            if cancelled():
+                error = "Cancelled"
+            else:
+                try:
+                    output_path = convert_to_mp3(source_path, self.ffmpeg_command, cancelled)
+                    if output_path is None:
+                        error = "Cancelled"
+                except (OSError, RuntimeError) as e:
+                    error = str(e)
+            try:
+                on_done(output_path, error)
+            except Exception as e:
+                print(f"[Error] Transcode callback failed for '{source_path}': {e}")
+
+    def shutdown(self, timeout=TERMINATE_TIMEOUT + 1):
+        """Stops running conversions (their ffmpeg is terminated), cancels queued ones and stops the workers."""
+        self.stopping.set()
+        for _ in self.threads:
+            self.tasks.put(None)
+        for thread in self.threads:
+            thread.join(timeout)
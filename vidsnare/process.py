@@ -0,0 +1,69 @@
+import os
+import queue
+import signal
+import threading
+import subprocess
+
+POLL_INTERVAL = 0.2 # Seconds between cancel checks while a process is silent
+TERMINATE_TIMEOUT = 3.0 # Seconds a cancelled process tree gets to exit before it is killed
+
+
+def popen_options():
+    """Returns Popen keyword arguments that start a process in its own process group, without a console window."""
+    if os.name == 'nt':
+        return {'creationflags': subprocess.CREATE_NO_WINDOW | subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {'start_new_session': True} # The process leads a new group; its ffmpeg children join it
+
+
+def signal_tree(process, force=False):
+    """Sends terminate (or kill) to a process and everything it started. Safe to call repeatedly."""
+    if os.name == 'nt':
+        if process.poll() is None:
+            # taskkill /T walks the child tree; /F is the only way to stop console programs without a window
+            subprocess.run(['taskkill', '/T', '/F', '/PID', str(process.pid)],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                           creationflags=subprocess.CREATE_NO_WINDOW)
+        return
+    try:
+        os.killpg(process.pid, signal.SIGKILL if force else signal.SIGTERM)
+    except (ProcessLookupError, PermissionError):
+        pass # Group already gone
+
+
+def stop_tree(process, timeout=TERMINATE_TIMEOUT):
+    """Terminates a process tree, kills it if still alive after `timeout` seconds, and reaps it.
+
+    Returns within about `timeout` seconds plus the time the kernel needs to deliver SIGKILL.
+    """
+    signal_tree(process)
+    try:
+        process.wait(timeout)
+    except subprocess.TimeoutExpired:
+        pass
+    signal_tree(process, force=True) # Also catches children that outlived the leader
+    process.wait()
+
+
+# --- Output Reader ---
+class OutputReader:
+    """Reads a process's text output on a background thread so the caller can wait with a timeout."""
+    def __init__(self, stream):
+        self.lines = queue.Queue()
+        self.thread = threading.Thread(target=self._read, args=(stream,), daemon=True)
+        self.thread.start()
+
+    def _read(self, stream):
+        try:
+            for line in stream:
+                self.lines.put(line)
+        except (OSError, ValueError):
+            pass # Stream closed under us after a kill
+        finally:
+            self.lines.put(None) # End of output
+
+    def get(self, timeout=POLL_INTERVAL):
+        """Returns the next line, None at end of output, or "" if nothing arrived within `timeout`."""
+        try:
+            return self.lines.get(timeout=timeout)
+        except queue.Empty:
+            return ""
@@ -0,0 +1,174 @@
+import re
+
+# --- Progress Protocol ---
+# yt-dlp prints one record per progress update through --progress-template, e.g.
+#   [vidsnare] dl|downloading|1048576|10485760|NA|524288.0|18|NA|3|12|dQw4w9WgXcQ
+#   [vidsnare] pp|started|Merger|3|12|dQw4w9WgXcQ
+# and, once an item's final file is in place (--print after_move):
+#   [vidsnare] done|Youtube|dQw4w9WgXcQ|3|12|/path/to/03 - Title [dQw4w9WgXcQ].mp4
+# Missing values are printed as NA by yt-dlp.
+PROGRESS_PREFIX = "[vidsnare] "
+
+DOWNLOAD_TEMPLATE = (PROGRESS_PREFIX + "dl|%(progress.status)s|%(progress.downloaded_bytes)s|%(progress.total_bytes)s"
+                     "|%(progress.total_bytes_estimate)s|%(progress.speed)s|%(progress.eta)s"
+                     "|%(progress.fragment_count)s|%(info.playlist_index)s|%(info.n_entries)s|%(info.id)s")
+POSTPROCESS_TEMPLATE = (PROGRESS_PREFIX + "pp|%(progress.status)s|%(progress.postprocessor)s"
+                        "|%(info.playlist_index)s|%(info.n_entries)s|%(info.id)s")
+DONE_TEMPLATE = (PROGRESS_PREFIX + "done|%(extractor_key)s|%(id)s|%(playlist_index)s|%(n_entries)s|%(filepath)s")
+
+PROGRESS_RE = re.compile(
+    r'\[vidsnare\] (?:'
+    r'dl\|(?P<status>[^|]*)\|(?P<downloaded>[^|]*)\|(?P<total>[^|]*)\|(?P<estimate>[^|]*)'
+    r'\|(?P<speed>[^|]*)\|(?P<eta>[^|]*)\|(?P<fragments>[^|]*)\|(?P<index>[^|]*)\|(?P<count>[^|]*)\|(?P<id>.*)'
+    r'|pp\|(?P<pp_status>[^|]*)\|(?P<postprocessor>[^|]*)\|(?P<pp_index>[^|]*)\|(?P<pp_count>[^|]*)\|(?P<pp_id>.*)'
+    r'|done\|(?P<extractor>[^|]*)\|(?P<done_id>[^|]*)\|(?P<done_index>[^|]*)\|(?P<done_count>[^|]*)\|(?P<filepath>.*)'
+    r')$'
+)
+
+
+def build_progress_args():
+    """Returns the yt-dlp options that make it print machine-readable progress records."""
+    return ['--progress-template', 'download:' + DOWNLOAD_TEMPLATE,
+            '--progress-template', 'postprocess:' + POSTPROCESS_TEMPLATE,
+            '--print', 'after_move:' + DONE_TEMPLATE,
+            '--no-quiet'] # --print implies --quiet, which would hide the regular log lines
+
+
+# --- Progress Event ---
+class ProgressEvent:
+    """One progress update for a job.
+
+    stage is "download", "postprocess" or "done" (final file saved). Numeric fields are None
+    when yt-dlp did not know them.
+    """
+    __slots__ = ("stage", "status", "downloaded_bytes", "total_bytes", "speed", "eta",
+                 "fragment_count", "playlist_index", "playlist_count", "video_id", "postprocessor", "extractor", "filepath")
+
+    def __init__(self, stage, status, downloaded_bytes=None, total_bytes=None, speed=None, eta=None, fragment_count=None,
+                 playlist_index=None, playlist_count=None, video_id=None, postprocessor=None,
+                 extractor=None, filepath=None):
+        self.stage = stage
+        self.status = status # downloading, finished, error (download); started, processing, finished (postprocess)
+        self.downloaded_bytes = downloaded_bytes
+        self.total_bytes = total_bytes # Exact size, or yt-dlp's estimate when the exact size is unknown
+        self.speed = speed # Bytes per second
+        self.eta = eta # Seconds
+        self.fragment_count = fragment_count # Set for fragmented (DASH/HLS) downloads
+        self.playlist_index = playlist_index
+        self.playlist_count = playlist_count
+        self.video_id = video_id
+        self.postprocessor = postprocessor # e.g. Merger, ExtractAudio
+        self.extractor = extractor # yt-dlp extractor key, e.g. Youtube (done events)
+        self.filepath = filepath # Final file path (done events)
+
+    @property
+    def fraction(self):
+        """Completed fraction of the current item (0.0-1.0), or None if unknown."""
+        if self.stage != "download" or self.status == "finished":
+            return 1.0
+        if self.downloaded_bytes is None or not self.total_bytes:
+            return None
+        return min(1.0, self.downloaded_bytes / self.total_bytes)
+
+    def overall_fraction(self):
+        """Completed fraction of the whole job, counting finished playlist items."""
+        fraction = self.fraction
+        if fraction is None:
+            return None
+        if self.playlist_index and self.playlist_count:
+            return min(1.0, (self.playlist_index - 1 + fraction) / self.playlist_count)
+        return fraction
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"ProgressEvent({fields})"
+
+
+def _number(text):
+    """Parses a template field, returning None for NA/empty values."""
+    if not text or text == "NA":
+        return None
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def _integer(text):
+    value = _number(text)
+    return None if value is None else int(value)
+
+
+def parse_progress_line(line):
+    """Returns a ProgressEvent for a progress record, or None for any other output line."""
+    if not line.startswith(PROGRESS_PREFIX): # Cheap check first; most lines are not records
+        return None
+    match = PROGRESS_RE.match(line)
+    if not match:
+        return None
+    groups = match.groupdict()
+    if groups["status"] is not None:
+        return ProgressEvent(
+            "download", groups["status"],
+            downloaded_bytes=_integer(groups["downloaded"]),
+            total_bytes=_integer(groups["total"]) or _integer(groups["estimate"]),
+            speed=_number(groups["speed"]),
+            eta=_integer(groups["eta"]),
+            fragment_count=_integer(groups["fragments"]),
+            playlist_index=_integer(groups["index"]),
+            playlist_count=_integer(groups["count"]),
+            video_id=None if groups["id"] == "NA" else groups["id"],
+        )
+    if groups["pp_status"] is None:
+        return ProgressEvent(
+            "done", "finished",
+            playlist_index=_integer(groups["done_index"]),
+            playlist_count=_integer(groups["done_count"]),
+            video_id=groups["done_id"],
+            extractor=None if groups["extractor"] == "NA" else groups["extractor"],
+            filepath=groups["filepath"],
+        )
+    return ProgressEvent(
+        "postprocess", groups["pp_status"],
+        playlist_index=_integer(groups["pp_index"]),
+        playlist_count=_integer(groups["pp_count"]),
+        video_id=None if groups["pp_id"] == "NA" else groups["pp_id"],
+        postprocessor=groups["postprocessor"],
+    )
+
+
+# --- Formatting ---
+def format_bytes(num_bytes):
+    """Formats a byte count like yt-dlp does (e.g. 10.00MiB)."""
+    if num_bytes is None:
+        return "?"
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(num_bytes) < 1024:
+            return f"{num_bytes:.2f}{unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:.2f}TiB"
+
+
+def format_eta(seconds):
+    """Formats seconds as M:SS or H:MM:SS."""
+    if seconds is None:
+        return "?"
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+
+def describe_event(event):
+    """Returns a short status text for a progress event, for the UI and the CLI."""
+    item = ""
+    if event.playlist_index:
+        item = f" (Item {event.playlist_index}/{event.playlist_count})" if event.playlist_count else f" (Item {event.playlist_index})"
+    if event.stage == "done":
+        return f"Saved{item}"
+    if event.stage == "postprocess":
+        return f"Processing{item}: {event.postprocessor}..."
+    fraction = event.fraction
+    percent = f" {fraction * 100:.1f}%" if fraction is not None else ""
+    speed = f" at {format_bytes(event.speed)}/s" if event.speed else ""
+    eta = f", ETA {format_eta(event.eta)}" if event.eta is not None and event.status == "downloading" else ""
+    return f"Downloading{item}{percent}{speed}{eta}"
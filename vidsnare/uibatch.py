@@ -0,0 +1,72 @@
+import time
+import queue
+import threading
+
+
+# --- UI Batcher ---
+class UiBatcher:
+    """Collects work from engine threads and applies it once per UI tick. Holds no toolkit state.
+
+    Engine threads append log lines to `log` (a LogBuffer), mark changed jobs dirty and queue calls.
+    The UI thread calls tick(view) on a timer; the view draws the lines, changed jobs and the overall
+    status (App draws into Tk widgets, the benchmark into plain strings).
+    on_call_latency(seconds) receives how long each queued call waited for its tick, and
+    on_batch_latency(seconds) how long the oldest line or job change of each batch waited.
+    """
+    def __init__(self, log, on_call_latency=None, on_batch_latency=None):
+        self.log = log
+        self.on_call_latency = on_call_latency
+        self.on_batch_latency = on_batch_latency
+        self.calls = queue.Queue() # (func, args, queued_at)
+        self.dirty_lock = threading.Lock()
+        self.dirty_jobs = {} # job_id -> job, changed since the last tick
+        self.dirty_since = None # time.monotonic() when the oldest undrawn job update arrived
+        self.overall_dirty = False # Status line / overall progress need a redraw
+        self.shown_lines = 0 # Lines currently in the view's output pane
+
+    def queue_call(self, func, *args):
+        self.calls.put((func, args, time.monotonic()))
+
+    def mark_job_dirty(self, job):
+        with self.dirty_lock:
+            self.dirty_jobs[job.job_id] = job # Only the latest state per tick is drawn
+            if self.dirty_since is None: self.dirty_since = time.monotonic()
+
+    def tick(self, view):
+        """Runs the queued calls, then applies the batched lines and job changes to the view."""
+        while True:
+            try:
+                func, args, queued_at = self.calls.get_nowait()
+            except queue.Empty:
+                break
+            if self.on_call_latency: self.on_call_latency(time.monotonic() - queued_at)
+            try: func(*args)
+            except Exception as e: print(f"[UI Error] Failed executing {func.__name__}: {e}")
+        self.flush(view)
+
+    def flush(self, view):
+        """Applies the work batched since the last tick: one line insert, one redraw per changed job, one overall update."""
+        with self.dirty_lock:
+            dirty_jobs, self.dirty_jobs = self.dirty_jobs, {}
+            dirty_since, self.dirty_since = self.dirty_since, None
+        pending_since = [since for since in (self.log.pending_since, dirty_since) if since is not None]
+        if pending_since and self.on_batch_latency: # Lines and job updates are the busiest path into the UI
+            self.on_batch_latency(time.monotonic() - min(pending_since))
+        self.flush_lines(view)
+        for job in dirty_jobs.values():
+            view.draw_job(job)
+            self.overall_dirty = True
+        if self.overall_dirty:
+            self.overall_dirty = False
+            view.draw_overall()
+
+    def flush_lines(self, view):
+        """Hands all pending log lines to the view in one call, with how many old lines to trim to the line cap."""
+        lines, dropped = self.log.take_pending()
+        if not lines: return
+        replace = bool(dropped) or len(lines) >= self.log.max_lines # Pending lines replace the whole pane
+        if replace: self.shown_lines = 0
+        self.shown_lines += len(lines)
+        trim = max(0, self.shown_lines - self.log.max_lines)
+        self.shown_lines -= trim
+        view.draw_lines(lines, replace, trim)
@@ -0,0 +1,119 @@
+import re
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Query parameters that only record where a link was shared from; they never change what is downloaded
+TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "igsh", "mc_cid", "mc_eid",
+                   "ref", "ref_src", "ref_url", "_ga", "si", "spm", "share_id", "is_from_webapp", "sender_device"}
+TRACKING_PREFIXES = ("utm_",)
+
+# YouTube links all name the same video by its 11 character id
+YOUTUBE_HOSTS = {"youtube.com", "www.youtube.com", "m.youtube.com", "music.youtube.com",
+                 "youtube-nocookie.com", "www.youtube-nocookie.com"}
+YOUTUBE_SHORT_HOSTS = {"youtu.be", "www.youtu.be"}
+YOUTUBE_ID_RE = re.compile(r'^[A-Za-z0-9_-]{11}$')
+YOUTUBE_PATH_RE = re.compile(r'^/(?:shorts|live|embed|v|e)/([A-Za-z0-9_-]{11})(?:/|$)')
+YOUTUBE_KEEP_PARAMS = {"list"} # Everything else on a video link is playback state (t, index, feature, pp, ...)
+
+URL_TOKEN_RE = re.compile(r'(?:[A-Za-z][A-Za-z0-9+.-]*://|www\.)\S+')
+BARE_HOST_RE = re.compile(r'^[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.([A-Za-z]{2,})([/?]|$)') # "youtu.be/..." typed without a scheme
+# A bare host without a path only counts as a URL under one of these ("example.com", but not "notes.txt")
+KNOWN_TLDS = {"com", "net", "org", "io", "tv", "be", "co", "me", "ly", "gg", "fm", "to", "info", "edu", "gov",
+              "uk", "de", "fr", "nl", "es", "it", "ru", "jp", "br", "ca", "au", "in", "us", "eu"}
+TRAILING_PUNCTUATION = '.,;:!?>"\'' # Sentence punctuation after a pasted link
+CLOSING_BRACKETS = {")": "(", "]": "["} # Only stripped when the URL has no matching opener
+# yt-dlp search keys, optionally with a result count ("ytsearch5:cats", "scsearchall:live set")
+SEARCH_KEYS = ("ytsearch", "ytsearchdate", "scsearch", "gvsearch", "bilisearch", "nicosearch", "nicosearchdate", "yvsearch")
+PREFIX_QUERY_RE = re.compile(r'^(?:%s)(?:\d+|all)?:\S' % "|".join(SEARCH_KEYS))
+BARE_ID_HINT_RE = re.compile(r'[0-9_-]') # Real ids almost always have one; 11 letter words ("Information") do not
+
+
+def strip_trailing_punctuation(url):
+    """Drops punctuation after a link in running text, keeping balanced brackets ("/wiki/Heat_(1995_film)")."""
+    while url:
+        last = url[-1]
+        if last in TRAILING_PUNCTUATION:
+            url = url[:-1]
+        elif last in CLOSING_BRACKETS and url.count(last) > url.count(CLOSING_BRACKETS[last]):
+            url = url[:-1]
+        else:
+            break
+    return url
+
+
+def is_bare_host(text):
+    """Returns True for a scheme-less link: a host with a path or query, or a bare host under a known TLD."""
+    match = BARE_HOST_RE.match(text)
+    return bool(match) and (bool(match.group(2)) or match.group(1).lower() in KNOWN_TLDS)
+
+
+def is_tracking_param(name):
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def youtube_video_id(parts):
+    """Returns the video id a YouTube link points at, or None (playlists, channels, other sites)."""
+    host = parts.netloc.lower()
+    if host in YOUTUBE_SHORT_HOSTS:
+        video_id = parts.path.strip("/").split("/")[0]
+        return video_id if YOUTUBE_ID_RE.match(video_id) else None
+    if host not in YOUTUBE_HOSTS:
+        return None
+    if parts.path == "/watch":
+        video_id = dict(parse_qsl(parts.query)).get("v", "")
+        return video_id if YOUTUBE_ID_RE.match(video_id) else None
+    match = YOUTUBE_PATH_RE.match(parts.path)
+    return match.group(1) if match else None
+
+
+def normalize_url(url):
+    """Returns the canonical form of a URL, or None if the text is not a URL.
+
+    Scheme and host are lowercased, tracking parameters and the fragment dropped and the query sorted.
+    YouTube short, mobile, Shorts and embed links and bare video ids (with a digit, - or _) become
+    https://www.youtube.com/watch?v=<id>. yt-dlp search queries ("ytsearch:...") are kept as they are.
+    """
+    url = url.strip().strip('<>"\'')
+    if YOUTUBE_ID_RE.match(url) and BARE_ID_HINT_RE.search(url): # A bare video id
+        return f"https://www.youtube.com/watch?v={url}"
+    if PREFIX_QUERY_RE.match(url):
+        return url # Passed to yt-dlp as typed
+    if "://" not in url and is_bare_host(url):
+        url = "https://" + url
+    try:
+        parts = urlsplit(url)
+    except ValueError: # Malformed, e.g. an unbalanced [ in the host
+        return None
+    if not parts.scheme or not parts.netloc:
+        return None
+    params = [(name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True) if not is_tracking_param(name)]
+    video_id = youtube_video_id(parts)
+    if video_id:
+        params = [("v", video_id)] + sorted((name, value) for name, value in params if name in YOUTUBE_KEEP_PARAMS)
+        return urlunsplit(("https", "www.youtube.com", "/watch", urlencode(params), ""))
+    userinfo, at, host = parts.netloc.rpartition("@") # User names and passwords are case sensitive
+    return urlunsplit((parts.scheme.lower(), userinfo + at + host.lower(), parts.path or "/", urlencode(sorted(params)), ""))
+
+
+def video_key(url):
+    """Returns (extractor, video_id) as the download index stores it for a normalized URL, or None if unknown."""
+    parts = urlsplit(url)
+    video_id = youtube_video_id(parts)
+    return ("Youtube", video_id) if video_id else None
+
+
+def parse_url_lines(lines):
+    """Returns the URLs in an iterable of lines, skipping blank lines and # comments.
+
+    A line may hold several URLs; text around them (e.g. a pasted chat message) is ignored.
+    A line without a URL is returned whole, so normalize_url() only accepts it if the whole
+    line is a bare video id or a search query; other text is reported as invalid.
+    """
+    urls = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        found = [strip_trailing_punctuation(url) for url in URL_TOKEN_RE.findall(line)]
+        urls.extend(found or [line]) # Scheme-less "youtu.be/<id>", ids and queries are checked by normalize_url
+    return urls